@@ -0,0 +1,226 @@
+"""Compressão gzip/brotli das respostas, com cache dos bytes já comprimidos."""
+import hashlib
+import zlib
+from collections import OrderedDict
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só há gzip
+    brotli = None
+
+
+# Tipos que valem a pena comprimir (JSON, CSV, NDJSON, texto)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def choose_encoding(accept_encoding: str, brotli_enabled: bool) -> str | None:
+    """Escolhe br ou gzip a partir do Accept-Encoding (respeitando q=0)."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip())
+
+    if brotli_enabled and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressedBodyCache:
+    """
+    LRU de corpos comprimidos, chaveado por (encoding, hash do corpo).
+
+    Usado só para respostas com Cache-Control public (ex: validate-code),
+    que se repetem byte a byte: calcular o hash custa bem menos que comprimir.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, bytes]) -> bytes | None:
+        compressed = self._entries.get(key)
+        if compressed is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return compressed
+
+    def put(self, key: tuple[str, bytes], compressed: bytes) -> None:
+        self._entries[key] = compressed
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        """Estado atual para métricas."""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Compartilhado por worker (métricas em get_compression_metrics)
+compressed_body_cache = CompressedBodyCache(settings.COMPRESSION_CACHE_MAX_ENTRIES)
+
+
+def get_compression_metrics() -> dict:
+    """Estado do cache de respostas comprimidas."""
+    return compressed_body_cache.snapshot()
+
+
+class _StreamCompressor:
+    """Compressor incremental com a mesma interface para gzip e brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._gzip = None
+        else:
+            self._brotli = None
+            # wbits=31: formato gzip (header + CRC)
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._gzip.compress(data)
+        # SYNC_FLUSH entrega cada parte ao cliente sem esperar o fim (exports)
+        return out + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compressão (gzip e, se o pacote existir, brotli).
+
+    - Só comprime tipos textuais sem Content-Encoding e, quando a resposta
+      vem inteira, com pelo menos `minimum_size` bytes
+    - Respostas em streaming (ex: /staff/export) são comprimidas por parte
+    - Respostas Cache-Control public reaproveitam os bytes comprimidos
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MIN_SIZE,
+        gzip_level: int = settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = settings.COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = compressed_body_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""),
+            brotli_enabled=brotli is not None,
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compress_body(self, encoding: str, body: bytes, cacheable: bool) -> bytes:
+        """Comprime um corpo completo, usando o cache quando permitido."""
+        key = None
+        if cacheable:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = self.cache.get(key)
+            if compressed is not None:
+                return compressed
+
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = _StreamCompressor("gzip", self.gzip_level, self.brotli_quality).compress(body, final=True)
+
+        if key is not None:
+            self.cache.put(key, compressed)
+        return compressed
+
+
+class _CompressionResponder:
+    """Intercepta o send de uma resposta e decide se/como comprimir."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Message | None = None
+        self.passthrough = False
+        self.compressor: _StreamCompressor | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                # Espera o primeiro corpo para saber tamanho/streaming
+                self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+
+            if not more_body:
+                # Resposta completa em uma mensagem
+                if len(body) < self.middleware.minimum_size:
+                    self.passthrough = True
+                    await self._send(start)
+                    await self._send(message)
+                    return
+                cacheable = "public" in headers.get("cache-control", "")
+                compressed = self.middleware.compress_body(self.encoding, body, cacheable)
+                headers["content-encoding"] = self.encoding
+                headers["content-length"] = str(len(compressed))
+                headers.add_vary_header("Accept-Encoding")
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming: comprime parte a parte, sem Content-Length
+            self.compressor = _StreamCompressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            del headers["content-length"]
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            await self._send(start)
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
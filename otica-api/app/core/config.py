@@ -10,10 +10,100 @@ class Settings(BaseSettings):
     CLERK_ISSUER: str
     CLERK_PUBLISHABLE_KEY: str | None = None  # Opcional, para uso futuro
     CLERK_SECRET_KEY: str | None = None  # Opcional, para uso futuro
+    CLERK_API_URL: str = "https://api.clerk.com/v1"  # Backend API (pode apontar para scripts/fake_clerk.py)
+    
+    # Cliente HTTP do Clerk (pool compartilhado)
+    CLERK_HTTP2: bool = True  # Requer httpx[http2]; sem o pacote h2 usa HTTP/1.1
+    CLERK_HTTP_CONNECT_TIMEOUT: float = 5.0
+    CLERK_HTTP_READ_TIMEOUT: float = 10.0
+    CLERK_HTTP_MAX_CONNECTIONS: int = 100
+    CLERK_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    CLERK_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    
+    # Resiliência das chamadas ao Clerk
+    CLERK_RETRY_ATTEMPTS: int = 3  # Tentativas para chamadas idempotentes
+    CLERK_RETRY_BASE_DELAY: float = 0.2  # Segundos (backoff exponencial com jitter)
+    CLERK_RETRY_MAX_DELAY: float = 2.0
+    CLERK_BREAKER_FAILURE_THRESHOLD: int = 5  # Falhas seguidas para abrir o circuito
+    CLERK_BREAKER_RESET_TIMEOUT: float = 30.0  # Segundos com o circuito aberto
+    CLERK_RATE_LIMIT_PER_SECOND: float = 10.0  # Por worker; some com o total de workers
+    CLERK_RATE_LIMIT_BURST: int = 20
+    CLERK_RETRY_AFTER_MAX: float = 30.0  # Teto para o Retry-After recebido em 429
+    CLERK_THROTTLE_RETRIES: int = 3  # Repetições após 429, à parte de CLERK_RETRY_ATTEMPTS
+    JWKS_CACHE_TTL: int = 300  # Segundos; JWKS expirado ainda é usado se o Clerk cair
+    
+    # Outbox de convites (envio assíncrono ao Clerk)
+    INVITATION_OUTBOX_DISPATCHER_ENABLED: bool = True  # Desative em workers que não devem enviar
+    INVITATION_OUTBOX_POLL_INTERVAL: float = 5.0  # Segundos entre verificações com a fila vazia
+    INVITATION_OUTBOX_BATCH_SIZE: int = 20
+    INVITATION_OUTBOX_CONCURRENCY: int = 5  # Chamadas simultâneas ao Clerk por lote
+    INVITATION_BULK_MAX_SIZE: int = 100  # Convites por requisição em /invitations/bulk
+    # Lease de um envio (renovado ao começar cada envio): deve cobrir o pior caso de uma
+    # chamada ao Clerk (tentativas x timeout + esperas de Retry-After e do rate limiter)
+    INVITATION_OUTBOX_LEASE_SECONDS: int = 300
+    INVITATION_OUTBOX_MAX_ATTEMPTS: int = 8
+    INVITATION_OUTBOX_BASE_BACKOFF: float = 5.0  # Segundos
+    INVITATION_OUTBOX_MAX_BACKOFF: float = 600.0
+    
+    # Idempotency-Key (POSTs de convite, aprovação e criação de staff)
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24  # Tempo em que uma resposta gravada pode ser repetida
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # Após isso, uma chave travada (worker caiu) pode ser retomada
+    IDEMPOTENCY_CLEANUP_INTERVAL: float = 3600.0  # Segundos entre limpezas de chaves expiradas
+    IDEMPOTENCY_CLEANUP_BATCH_SIZE: int = 1000
+    
+    # Cache do endpoint público validate-code (por worker)
+    PUBLIC_ORG_CACHE_TTL: float = 60.0  # Segundos; também usado no Cache-Control
+    PUBLIC_ORG_NEGATIVE_CACHE_TTL: float = 30.0  # Códigos inexistentes
+    PUBLIC_ORG_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Rate limiting dos endpoints públicos (por worker)
+    PUBLIC_RATE_LIMIT_WINDOW: float = 60.0  # Segundos
+    PUBLIC_RATE_LIMIT_PER_IP: int = 60  # Requisições por IP na janela
+    PUBLIC_INVALID_CODE_LIMIT_PER_IP: int = 20  # Códigos inválidos por IP na janela (digitação gera alguns)
+    PUBLIC_RATE_LIMIT_PER_CODE: int = 10  # Solicitações de acesso por código na janela
+    PUBLIC_RATE_LIMIT_MAX_KEYS: int = 100000  # Chaves (IPs/códigos) rastreadas em memória
+    PUBLIC_MAX_IN_FLIGHT: int = 50  # Requisições públicas simultâneas antes de responder 503
+    TRUST_PROXY_HEADERS: bool = False  # Usa X-Forwarded-For (só atrás de proxy confiável)
+    
+    # /batch (multiplexação de chamadas)
+    BATCH_MAX_REQUESTS: int = 20  # Sub-requisições por chamada
+    BATCH_MAX_CONCURRENCY: int = 4  # GETs simultâneos (cada um usa uma conexão do pool)
+    
+    # Compressão das respostas (gzip; brotli se o pacote estiver instalado)
+    COMPRESSION_ENABLED: bool = True  # Desative se o proxy reverso já comprime
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; respostas menores vão sem compressão
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (rápido) a 9 (menor)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 a 11; 4-5 é um bom equilíbrio para respostas dinâmicas
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256  # Respostas públicas com bytes comprimidos em cache
     
     # Database
     DATABASE_URL: str
     
+    # Importação em massa de staff
+    STAFF_IMPORT_MAX_ROWS: int = 50000
+    
+    # Debug / diagnóstico
+    DEBUG: bool = False  # Expõe headers de diagnóstico (ex: X-DB-Query-Count)
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # Repetições do mesmo statement por request antes do warning
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json (produção) ou text (desenvolvimento)
+    LOG_SQL: bool = False  # Loga todos os statements SQL (substitui o echo do engine)
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # Fração das requisições com logs DEBUG (ex: 0.01)
+    
+    # Métricas Prometheus (/metrics); multiprocess via env PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""  # Obrigatório: /metrics exige Authorization: Bearer <token> (sem token fica 404)
+    METRICS_SYNC_INTERVAL: float = 5.0  # Segundos entre cópias dos contadores em memória para as métricas
+    
+    # Tracing OpenTelemetry (opcional, pacotes em requirements-tracing.txt)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"  # otlp (HTTP/protobuf) ou console
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SERVICE_NAME: str = "otica-api"
+    TRACING_SAMPLE_RATIO: float = 1.0  # Fração dos traces gravados (respeita a decisão do chamador)
+    
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
     
@@ -1,7 +1,24 @@
 """Configuração do banco de dados SQLAlchemy."""
+import time
+from dataclasses import dataclass
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 from app.core.config import settings
+from app.core import query_stats
+from app.core.metrics import observe_db_pool_checkout
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool padrão do engine assíncrono, medindo o tempo de checkout (métricas)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observe_db_pool_checkout(time.perf_counter() - start)
 
 
 # Engine assíncrono
@@ -9,8 +26,11 @@ from app.core.config import settings
 # Por isso desabilitamos o cache de prepared statements
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,  # Log SQL queries (desativar em produção)
+    # SQL é logado pelo logger sqlalchemy.engine quando LOG_SQL=true
+    # (ver app/core/logging_config.py), não pelo echo direto em stdout
+    echo=False,
     future=True,
+    poolclass=TimedQueuePool,
     connect_args={
         "server_settings": {
             "jit": "off"  # Desabilita JIT para compatibilidade com pgbouncer
@@ -19,6 +39,10 @@ engine = create_async_engine(
     },
 )
 
+# Contagem/tempo de statements por request (ver app/core/query_stats.py)
+event.listen(engine.sync_engine, "before_cursor_execute", query_stats.before_cursor_execute)
+event.listen(engine.sync_engine, "after_cursor_execute", query_stats.after_cursor_execute)
+
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -34,11 +58,48 @@ class Base(DeclarativeBase):
     pass
 
 
+# Chave em Session.info que marca se a sessão chegou a usar uma conexão
+_DB_USED_KEY = "db_used"
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_session_used(session, transaction, connection):
+    """Marca a sessão como usada quando ela faz checkout de uma conexão do pool."""
+    session.info[_DB_USED_KEY] = True
+
+
+@dataclass
+class SessionUsageStats:
+    """Contadores de uso das sessões criadas por get_db."""
+    requests_total: int = 0
+    requests_without_db: int = 0
+    
+    def snapshot(self) -> dict:
+        """Retorna os contadores atuais."""
+        return {
+            "requests_total": self.requests_total,
+            "requests_without_db": self.requests_without_db,
+        }
+
+
+session_usage = SessionUsageStats()
+
+
 async def get_db() -> AsyncSession:
-    """Dependency para obter sessão do banco de dados."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
+    """
+    Dependency para obter sessão do banco de dados.
+    
+    A sessão é lazy: nenhuma conexão sai do pool até o primeiro statement.
+    Requests que falham antes disso (auth, validação) ou que são servidos
+    de cache terminam sem tocar no banco e sem custo de teardown.
+    """
+    session = AsyncSessionLocal()
+    try:
+        yield session
+    finally:
+        session_usage.requests_total += 1
+        if session.info.get(_DB_USED_KEY):
             await session.close()
+        else:
+            session_usage.requests_without_db += 1
 
@@ -0,0 +1,59 @@
+"""ETag fraco e GET condicional (If-None-Match) para listagens."""
+import hashlib
+from fastapi import Request, Response, status
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# O navegador guarda a resposta, mas sempre revalida com If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def table_version(model, *criteria) -> Select:
+    """
+    Versão das linhas de um tenant: count + max(updated_at).
+
+    Muda em insert, update (onupdate de updated_at, inclusive soft delete)
+    e delete; só lê o index de organização, sem carregar as linhas.
+    """
+    return select(func.count(model.id), func.max(model.updated_at)).where(*criteria)
+
+
+async def collection_etag(db: AsyncSession, request: Request, scope: str, *versions: Select) -> str:
+    """
+    Calcula o ETag de uma listagem em um único round trip.
+
+    Combina as versões das tabelas envolvidas com o tenant (`scope`), o path
+    e a query string, já que filtros diferentes geram respostas diferentes.
+    """
+    subqueries = [version.subquery() for version in versions]
+    result = await db.execute(select(*[column for sq in subqueries for column in sq.c]))
+    parts = [scope, request.url.path, request.url.query, *(str(value) for value in result.one())]
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Compara o If-None-Match do cliente com o ETag atual (comparação fraca)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Resposta 304 sem corpo."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    """Adiciona ETag e Cache-Control a uma resposta 200."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -0,0 +1,62 @@
+"""Caminho rápido de leitura para listagens (Core rows direto para JSON)."""
+from typing import Optional, Type
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel
+from pydantic_core import to_json
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> list:
+    """
+    Colunas do model que correspondem aos campos do schema de resposta.
+
+    Campos do schema que não são colunas do model (ex: store_name) ficam de
+    fora e devem ser adicionados na query com .label().
+    """
+    columns = model.__table__.columns
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
+
+
+# Parâmetro fields= das listagens (sparse fieldsets)
+FIELDS_QUERY = Query(
+    None,
+    description="Campos a retornar, separados por vírgula (ex: id,name). `id` sempre vem.",
+)
+
+
+def sparse_columns(columns: list, fields: Optional[str]) -> list:
+    """
+    Restringe as colunas de uma listagem ao parâmetro fields=a,b,c.
+
+    Afeta o SELECT e, por consequência, o JSON (as chaves vêm das colunas).
+    `id` é sempre incluído; nomes desconhecidos geram 400.
+    """
+    if not fields:
+        return columns
+
+    available = [column.key for column in columns]
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(available)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos em fields: {', '.join(sorted(unknown))}. Disponíveis: {', '.join(available)}"
+        )
+
+    requested.add("id")
+    return [column for column in columns if column.key in requested]
+
+
+async def fetch_json_response(db: AsyncSession, query: Select) -> Response:
+    """
+    Executa um SELECT de colunas e devolve as linhas já serializadas em JSON.
+
+    Para listagens somente leitura: não hidrata entidades ORM (sem identity
+    map) nem revalida via response_model; os nomes das colunas/labels viram
+    as chaves do JSON. O response_model da rota continua documentando o
+    formato no OpenAPI.
+    """
+    result = await db.execute(query)
+    rows = [row._asdict() for row in result]
+    return Response(content=to_json(rows), media_type="application/json")
@@ -0,0 +1,59 @@
+"""Cliente HTTP compartilhado (pool de conexões) para chamadas ao Clerk."""
+import httpx
+from app.core.config import settings
+
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 depende do pacote h2 (httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Cria o cliente com limites de conexão, keep-alive e timeouts do Settings."""
+    return httpx.AsyncClient(
+        http2=settings.CLERK_HTTP2 and _http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.CLERK_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CLERK_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.CLERK_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.CLERK_HTTP_READ_TIMEOUT,
+            connect=settings.CLERK_HTTP_CONNECT_TIMEOUT,
+        ),
+    )
+
+
+async def start_http_client() -> None:
+    """Abre o cliente compartilhado (chamado no startup do lifespan)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+
+
+async def close_http_client() -> None:
+    """Fecha o cliente e suas conexões (chamado no shutdown do lifespan)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente compartilhado.
+
+    Fora do lifespan da aplicação (ex: scripts) o cliente é criado sob demanda;
+    nesse caso quem chamou deve usar close_http_client() ao terminar.
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+    return _http_client
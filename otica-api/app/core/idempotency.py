@@ -0,0 +1,238 @@
+"""Suporte ao header Idempotency-Key em POSTs que criam registros ou convites."""
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.security import verify_token
+from app.models.idempotency_key_model import IdempotencyKey
+
+
+logger = logging.getLogger(__name__)
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+class IdempotentReplay(Exception):
+    """Interrompe a requisição devolvendo a resposta já gravada para a chave."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+def _request_hash(request: Request, body: bytes) -> str:
+    """Impressão digital da requisição, para detectar chave reutilizada com outro conteúdo."""
+    digest = hashlib.sha256()
+    for part in (request.method, request.url.path, request.url.query):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+async def idempotency_key(
+    request: Request,
+    key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Chave única (ex: UUID) para repetir a requisição sem duplicar o efeito",
+    ),
+    token_data: dict = Depends(verify_token),
+) -> Optional[str]:
+    """
+    Dependency que reserva a Idempotency-Key antes do endpoint rodar.
+
+    - Chave nova: grava a reserva (sem resposta) e deixa o endpoint executar
+    - Chave já concluída com a mesma requisição: devolve a resposta gravada
+      (IdempotentReplay) sem executar o endpoint
+    - Chave em processamento: 409; chave usada com outra requisição: 422
+
+    A chave é escopada por organização e usuário do token. Só funciona em
+    routers criados com route_class=IdempotentRoute.
+    """
+    if key is None:
+        return None
+
+    scope = (
+        IdempotencyKey.organization_id == token_data["org_id"],
+        IdempotencyKey.user_id == token_data["user_id"],
+        IdempotencyKey.key == key,
+    )
+    request_hash = _request_hash(request, await request.body())
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+    # Sessão própria: a reserva precisa ser visível antes do endpoint terminar
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            insert(IdempotencyKey)
+            .values(
+                organization_id=token_data["org_id"],
+                user_id=token_data["user_id"],
+                key=key,
+                request_hash=request_hash,
+                expires_at=expires_at,
+            )
+            .on_conflict_do_nothing(index_elements=["organization_id", "user_id", "key"])
+            .returning(IdempotencyKey.id)
+        )
+        claim_id = result.scalar_one_or_none()
+
+        if claim_id is None:
+            # Chave expirada, ou reserva abandonada (worker caiu) da mesma requisição
+            stale_lock = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+            result = await session.execute(
+                update(IdempotencyKey)
+                .where(
+                    *scope,
+                    or_(
+                        IdempotencyKey.expires_at <= now,
+                        and_(
+                            IdempotencyKey.status_code.is_(None),
+                            IdempotencyKey.request_hash == request_hash,
+                            IdempotencyKey.updated_at <= stale_lock,
+                        ),
+                    ),
+                )
+                .values(
+                    request_hash=request_hash,
+                    status_code=None,
+                    media_type=None,
+                    response_body=None,
+                    expires_at=expires_at,
+                )
+                .returning(IdempotencyKey.id)
+            )
+            claim_id = result.scalar_one_or_none()
+
+        existing = None
+        if claim_id is None:
+            result = await session.execute(
+                select(
+                    IdempotencyKey.request_hash,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.media_type,
+                    IdempotencyKey.response_body,
+                ).where(*scope)
+            )
+            existing = result.one()
+
+        await session.commit()
+
+    if existing is not None:
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key já foi usada com outra requisição"
+            )
+        if existing.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Requisição com esta Idempotency-Key ainda está em processamento"
+            )
+        raise IdempotentReplay(Response(
+            content=existing.response_body,
+            status_code=existing.status_code,
+            media_type=existing.media_type,
+            headers={REPLAY_HEADER: "true"},
+        ))
+
+    request.state.idempotency_claim_id = claim_id
+    return key
+
+
+async def _release_claim(claim_id: int) -> None:
+    """Apaga a reserva para que a próxima tentativa execute o endpoint de novo."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == claim_id))
+        await session.commit()
+
+
+async def _complete_claim(claim_id: int, response: Response) -> None:
+    """Grava a resposta na reserva, encerrando o processamento da chave."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == claim_id)
+            .values(
+                status_code=response.status_code,
+                media_type=response.headers.get("content-type"),
+                response_body=bytes(response.body),
+            )
+        )
+        await session.commit()
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Rota que grava/repete respostas de endpoints com Depends(idempotency_key).
+
+    Só respostas < 500 com corpo em memória são gravadas. Exceções (inclusive
+    HTTPException 4xx) e 5xx liberam a chave: como a transação do endpoint foi
+    desfeita, repetir a requisição é seguro.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except IdempotentReplay as replay:
+                return replay.response
+            except Exception:
+                claim_id = getattr(request.state, "idempotency_claim_id", None)
+                if claim_id is not None:
+                    await _release_claim(claim_id)
+                raise
+
+            claim_id = getattr(request.state, "idempotency_claim_id", None)
+            if claim_id is not None:
+                if response.status_code < 500 and hasattr(response, "body"):
+                    await _complete_claim(claim_id, response)
+                else:
+                    await _release_claim(claim_id)
+            return response
+
+        return idempotent_handler
+
+
+async def purge_expired_keys() -> int:
+    """Remove chaves expiradas em lotes pequenos. Retorna quantas foram apagadas."""
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            expired = (
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+                .limit(settings.IDEMPOTENCY_CLEANUP_BATCH_SIZE)
+            )
+            result = await session.execute(
+                delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired.scalar_subquery()))
+            )
+            await session.commit()
+        total += result.rowcount
+        if result.rowcount < settings.IDEMPOTENCY_CLEANUP_BATCH_SIZE:
+            return total
+
+
+async def run_cleanup() -> None:
+    """Loop de limpeza das chaves expiradas (task iniciada no lifespan da aplicação)."""
+    while True:
+        try:
+            removed = await purge_expired_keys()
+            if removed:
+                logger.info("idempotency keys expiradas removidas: %s", removed)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("erro na limpeza de idempotency keys")
+        await asyncio.sleep(settings.IDEMPOTENCY_CLEANUP_INTERVAL)
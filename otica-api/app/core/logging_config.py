@@ -0,0 +1,190 @@
+"""Logging estruturado (JSON) fora do event loop, com request id por requisição."""
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from pydantic_core import to_json
+from starlette.datastructures import Headers
+from app.core.config import settings
+
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Request id informado pelo cliente é aceito até este tamanho
+_MAX_REQUEST_ID_LENGTH = 128
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Se os logs DEBUG da requisição atual entram na amostra
+_debug_sampled: ContextVar[Optional[bool]] = ContextVar("debug_sampled", default=None)
+
+# Atributos padrão do LogRecord; o resto veio de extra= e vai para o JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def get_request_id() -> Optional[str]:
+    """Request id da requisição atual (None fora de uma requisição)."""
+    return _request_id.get()
+
+
+# ============================================
+# FORMATTER E FILTROS
+# ============================================
+
+class JSONFormatter(logging.Formatter):
+    """Uma linha JSON por log, com os campos passados em extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return to_json(payload, fallback=str).decode()
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Anexa o request id ao record e aplica a amostragem dos logs DEBUG.
+
+    A amostragem é decidida uma vez por requisição (RequestIdMiddleware):
+    numa requisição amostrada todos os DEBUG saem, nas outras nenhum.
+    Fora de requisições o sorteio é por log.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        if record.levelno <= logging.DEBUG and settings.LOG_DEBUG_SAMPLE_RATE < 1:
+            sampled = _debug_sampled.get()
+            if sampled is None:
+                sampled = random.random() < settings.LOG_DEBUG_SAMPLE_RATE
+            return sampled
+        return True
+
+
+class _ContextQueueHandler(QueueHandler):
+    """
+    QueueHandler que preserva os campos estruturados.
+
+    O prepare() padrão junta a mensagem e o traceback em uma string; aqui a
+    mensagem é resolvida e o traceback vira texto (exc_info não atravessa a
+    fila), mantendo os extras para o formatter da thread do listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# ============================================
+# SETUP
+# ============================================
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    Configura o logging da aplicação (chamar uma vez, na importação do app).
+
+    - Os handlers do root só enfileiram; a escrita em stdout (formatação
+      JSON incluída) roda na thread do QueueListener, fora do event loop
+    - Nível via LOG_LEVEL; formato via LOG_FORMAT (json ou text)
+    - Logs do uvicorn passam pela mesma fila e formato
+    - SQL do SQLAlchemy só com LOG_SQL (substitui o antigo echo=True)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _ContextQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.LOG_SQL else logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e para a thread do listener (fim do lifespan)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI que define o request id de cada requisição.
+
+    Reaproveita o X-Request-ID do cliente/proxy (se razoável) ou gera um
+    novo, devolve no header da resposta e o disponibiliza para os logs.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+        if not request_id or len(request_id) > _MAX_REQUEST_ID_LENGTH or not request_id.isprintable():
+            request_id = uuid.uuid4().hex
+
+        id_token = _request_id.set(request_id)
+        sampled_token = _debug_sampled.set(random.random() < settings.LOG_DEBUG_SAMPLE_RATE)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _debug_sampled.reset(sampled_token)
+            _request_id.reset(id_token)
@@ -0,0 +1,322 @@
+"""
+Métricas Prometheus (endpoint /metrics).
+
+Com vários workers (uvicorn --workers / gunicorn), defina a variável de
+ambiente PROMETHEUS_MULTIPROC_DIR apontando para um diretório vazio e
+exclusivo antes de subir o servidor: cada worker grava suas métricas em
+arquivos mmap e o /metrics de qualquer worker agrega todos. No gunicorn,
+chame prometheus_client.multiprocess.mark_process_dead(worker.pid) no hook
+child_exit.
+"""
+import asyncio
+import logging
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Métodos fora desta lista viram "OTHER" (evita explosão de labels)
+_KNOWN_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+
+
+# ============================================
+# HTTP
+# ============================================
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Requisições HTTP por método, rota (template) e status",
+    ["method", "route", "status"],
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por método e rota (template)",
+    ["method", "route"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requisições HTTP em andamento",
+    multiprocess_mode="livesum",
+)
+
+
+# ============================================
+# BANCO (pool do SQLAlchemy e sessões)
+# ============================================
+
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Tempo para obter uma conexão do pool (espera por conexão livre + conexão nova)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Conexões do pool em uso",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "db_pool_checked_in_connections",
+    "Conexões ociosas no pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Conexões abertas além de pool_size",
+    multiprocess_mode="livesum",
+)
+DB_SESSIONS = Counter(
+    "db_sessions_total",
+    "Sessões criadas por get_db, por uso do banco",
+    ["used"],
+)
+
+
+# ============================================
+# AUTENTICAÇÃO E CLERK
+# ============================================
+
+JWKS_CACHE = Counter(
+    "jwks_cache_requests_total",
+    "Consultas ao cache do JWKS (hit, refresh = busca no Clerk, stale = cache expirado usado por falha do Clerk, "
+    "error = Clerk respondeu 4xx/5xx)",
+    ["result"],
+)
+CLERK_REQUESTS = Counter(
+    "clerk_requests_total",
+    "Tentativas de chamada ao Clerk por operação e resultado (2xx, 4xx, 429, 5xx, timeout, network_error, circuit_open)",
+    ["operation", "outcome"],
+)
+CLERK_DURATION = Histogram(
+    "clerk_request_duration_seconds",
+    "Latência de cada tentativa de chamada ao Clerk",
+    ["operation"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+CLERK_BREAKER_OPEN = Gauge(
+    "clerk_circuit_breaker_open",
+    "1 se o circuit breaker não está fechado (open/half_open)",
+    ["breaker"],
+    multiprocess_mode="livemax",
+)
+CLERK_BREAKER_OPENED = Counter("clerk_circuit_breaker_opened_total", "Aberturas do circuit breaker", ["breaker"])
+CLERK_BREAKER_REJECTED = Counter(
+    "clerk_circuit_breaker_rejected_total", "Chamadas recusadas pelo circuit breaker", ["breaker"]
+)
+CLERK_LIMITER_QUEUE = Gauge(
+    "clerk_rate_limiter_queue_depth",
+    "Chamadas aguardando o rate limiter do Clerk",
+    multiprocess_mode="livesum",
+)
+CLERK_LIMITER_ACQUIRED = Counter("clerk_rate_limiter_acquired_total", "Chamadas liberadas pelo rate limiter do Clerk")
+CLERK_LIMITER_WAIT = Counter("clerk_rate_limiter_wait_seconds_total", "Tempo total de espera no rate limiter do Clerk")
+CLERK_LIMITER_THROTTLED = Counter("clerk_rate_limiter_throttled_total", "Respostas 429 do Clerk (pausas do limiter)")
+
+
+# ============================================
+# ENDPOINTS PÚBLICOS E CACHES
+# ============================================
+
+PUBLIC_RATE_LIMIT = Counter(
+    "public_rate_limit_decisions_total",
+    "Decisões dos rate limiters públicos",
+    ["limiter", "decision"],
+)
+PUBLIC_IN_FLIGHT = Gauge(
+    "public_requests_in_flight",
+    "Requisições públicas em andamento (load shedding)",
+    multiprocess_mode="livesum",
+)
+PUBLIC_SHED = Counter("public_requests_shed_total", "Requisições públicas recusadas com 503")
+PUBLIC_ORG_CACHE = Counter(
+    "public_org_cache_requests_total",
+    "Consultas ao cache do validate-code (hit, negative_hit, miss)",
+    ["result"],
+)
+PUBLIC_ORG_CACHE_ENTRIES = Gauge(
+    "public_org_cache_entries", "Entradas no cache do validate-code", multiprocess_mode="livesum"
+)
+COMPRESSION_CACHE = Counter(
+    "compression_cache_requests_total",
+    "Consultas ao cache de respostas comprimidas (hit, miss)",
+    ["result"],
+)
+COMPRESSION_CACHE_ENTRIES = Gauge(
+    "compression_cache_entries", "Entradas no cache de respostas comprimidas", multiprocess_mode="livesum"
+)
+
+
+# ============================================
+# OBSERVAÇÕES (chamadas pelos módulos instrumentados)
+# ============================================
+
+def observe_db_pool_checkout(seconds: float) -> None:
+    DB_POOL_CHECKOUT.observe(seconds)
+
+
+def observe_jwks_cache(result: str) -> None:
+    JWKS_CACHE.labels(result).inc()
+
+
+def observe_clerk_request(operation: str, outcome: str, seconds: float | None = None) -> None:
+    CLERK_REQUESTS.labels(operation, outcome).inc()
+    if seconds is not None:
+        CLERK_DURATION.labels(operation).observe(seconds)
+
+
+# ============================================
+# SINCRONIZAÇÃO DOS CONTADORES EM MEMÓRIA
+# ============================================
+
+# Último valor publicado de cada contador vindo de snapshot()
+_published: dict[tuple, float] = {}
+
+
+def _publish_counter(counter, value: float, *labels: str) -> None:
+    """Converte um total acumulado (snapshot) em incremento do Counter."""
+    key = (counter, labels)
+    delta = value - _published.get(key, 0.0)
+    if delta > 0:
+        (counter.labels(*labels) if labels else counter).inc(delta)
+        _published[key] = value
+
+
+def sync_runtime_metrics() -> None:
+    """
+    Copia os contadores em memória (snapshot() dos módulos) para as métricas.
+
+    Roda periodicamente em cada worker (run_sync) e no worker que atende o
+    /metrics, para que o modo multiprocess enxergue o estado de todos.
+    """
+    from app.core.compression import get_compression_metrics
+    from app.core.database import engine, session_usage
+    from app.core.rate_limit import get_rate_limit_metrics
+    from app.services.clerk_service import get_breaker_metrics, get_rate_limiter_metrics
+    from app.services.public_org_cache import public_org_cache
+
+    pool = engine.pool
+    DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    DB_POOL_CHECKED_IN.set(pool.checkedin())
+    DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    sessions = session_usage.snapshot()
+    _publish_counter(DB_SESSIONS, sessions["requests_total"] - sessions["requests_without_db"], "true")
+    _publish_counter(DB_SESSIONS, sessions["requests_without_db"], "false")
+
+    for name, breaker in get_breaker_metrics().items():
+        CLERK_BREAKER_OPEN.labels(name).set(0 if breaker["state"] == "closed" else 1)
+        _publish_counter(CLERK_BREAKER_OPENED, breaker["opened_total"], name)
+        _publish_counter(CLERK_BREAKER_REJECTED, breaker["rejected_total"], name)
+
+    limiter = get_rate_limiter_metrics()
+    CLERK_LIMITER_QUEUE.set(limiter["queue_depth"])
+    _publish_counter(CLERK_LIMITER_ACQUIRED, limiter["acquired_total"])
+    _publish_counter(CLERK_LIMITER_WAIT, limiter["wait_seconds_total"])
+    _publish_counter(CLERK_LIMITER_THROTTLED, limiter["throttled_total"])
+
+    rate_limits = get_rate_limit_metrics()
+    shedding = rate_limits.pop("public_load_shedding")
+    PUBLIC_IN_FLIGHT.set(shedding["in_flight"])
+    _publish_counter(PUBLIC_SHED, shedding["shed_total"])
+    for name, counters in rate_limits.items():
+        _publish_counter(PUBLIC_RATE_LIMIT, counters["allowed_total"], name, "allowed")
+        _publish_counter(PUBLIC_RATE_LIMIT, counters["rejected_total"], name, "rejected")
+
+    org_cache = public_org_cache.snapshot()
+    PUBLIC_ORG_CACHE_ENTRIES.set(org_cache["entries"])
+    for result in ("hits", "negative_hits", "misses"):
+        _publish_counter(PUBLIC_ORG_CACHE, org_cache[result], result[:-1])
+
+    compression = get_compression_metrics()
+    COMPRESSION_CACHE_ENTRIES.set(compression["entries"])
+    _publish_counter(COMPRESSION_CACHE, compression["hits"], "hit")
+    _publish_counter(COMPRESSION_CACHE, compression["misses"], "miss")
+
+
+async def run_sync() -> None:
+    """Loop de sincronização (uma task por worker, iniciada no lifespan)."""
+    while True:
+        try:
+            sync_runtime_metrics()
+        except Exception:
+            logger.exception("erro ao sincronizar métricas")
+        await asyncio.sleep(settings.METRICS_SYNC_INTERVAL)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposição no formato texto do Prometheus (agregando os workers se multiprocess)."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+def route_template(scope) -> str:
+    """Template da rota atendida (ex: /api/v1/staff/{staff_id}) ou "unmatched"."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Versões novas do FastAPI expõem o path relativo ao include_router;
+    # o prefixo (sempre literal) é recuperado do path da requisição
+    path = scope.get("path", "")
+    missing = path.count("/") - template.count("/")
+    if missing > 0:
+        template = "/".join(path.split("/")[:missing + 1]) + template
+    return template
+
+
+class PrometheusMiddleware:
+    """
+    Middleware ASGI com contagem, latência e requisições em andamento.
+
+    A rota é o template (ex: /api/v1/staff/{staff_id}), não o path, para
+    manter a cardinalidade baixa; paths sem rota viram "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in _KNOWN_METHODS else "OTHER"
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_DURATION.labels(method, route).observe(elapsed)
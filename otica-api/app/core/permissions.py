@@ -1,12 +1,16 @@
 """Controle de acesso baseado em roles."""
-from fastapi import Depends, HTTPException, status
+import logging
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
 from app.core.security import get_current_org_id, get_current_user_id
 from app.models.staff_model import StaffMember, StaffRole
-import httpx
 from app.core.config import settings
+from app.services.clerk_service import ClerkService, clerk_request
+
+
+logger = logging.getLogger(__name__)
 
 
 async def get_user_email_from_clerk(user_id: str) -> str | None:
@@ -17,39 +21,46 @@ async def get_user_email_from_clerk(user_id: str) -> str | None:
     ao clerk_id do usuário que acabou de criar sua conta.
     """
     if not settings.CLERK_SECRET_KEY:
-        print("⚠️ CLERK_SECRET_KEY não configurado")
+        logger.warning("CLERK_SECRET_KEY não configurado")
         return None
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.clerk.com/v1/users/{user_id}",
-                headers={
-                    "Authorization": f"Bearer {settings.CLERK_SECRET_KEY}",
-                    "Content-Type": "application/json"
-                }
+        response = await clerk_request(
+            "GET",
+            f"{ClerkService.BASE_URL}/users/{user_id}",
+            operation="get_user",
+            idempotent=True,
+            headers={
+                "Authorization": f"Bearer {settings.CLERK_SECRET_KEY}",
+                "Content-Type": "application/json"
+            }
+        )
+        
+        if response.status_code == 200:
+            user_data = response.json()
+            email_addresses = user_data.get("email_addresses", [])
+            if email_addresses:
+                primary = next(
+                    (e for e in email_addresses if e.get("id") == user_data.get("primary_email_address_id")),
+                    email_addresses[0]
+                )
+                email = primary.get("email_address")
+                logger.debug("email encontrado no Clerk", extra={"clerk_user_id": user_id})
+                return email
+        else:
+            logger.warning(
+                "Clerk API retornou %s ao buscar email",
+                response.status_code,
+                extra={"clerk_user_id": user_id, "status_code": response.status_code, "response_body": response.text[:500]},
             )
-            
-            if response.status_code == 200:
-                user_data = response.json()
-                email_addresses = user_data.get("email_addresses", [])
-                if email_addresses:
-                    primary = next(
-                        (e for e in email_addresses if e.get("id") == user_data.get("primary_email_address_id")),
-                        email_addresses[0]
-                    )
-                    email = primary.get("email_address")
-                    print(f"📧 Email encontrado no Clerk para {user_id}: {email}")
-                    return email
-            else:
-                print(f"⚠️ Clerk API retornou {response.status_code}: {response.text}")
-            return None
-    except Exception as e:
-        print(f"❌ Erro ao buscar email do Clerk: {e}")
+        return None
+    except Exception:
+        logger.exception("erro ao buscar email do Clerk", extra={"clerk_user_id": user_id})
         return None
 
 
 async def get_current_staff(
+    request: Request,
     current_org_id: str = Depends(get_current_org_id),
     current_user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
@@ -60,8 +71,13 @@ async def get_current_staff(
     Busca o staff pelo clerk_id (user_id do token) e organization_id.
     Se não encontrar pelo clerk_id, tenta encontrar pelo email (para usuários
     que acabaram de aceitar o convite) e atualiza o clerk_id.
+    Em sub-requisições de /batch usa o staff já resolvido na requisição principal.
     """
-    print(f"🔍 Buscando staff: clerk_id={current_user_id}, org_id={current_org_id}")
+    batch_staff = getattr(request.state, "current_staff", None)
+    if batch_staff is not None:
+        return batch_staff
+    
+    logger.debug("buscando staff", extra={"clerk_user_id": current_user_id, "organization_id": current_org_id})
     
     # 1. Primeiro, tenta buscar pelo clerk_id
     result = await db.execute(
@@ -74,10 +90,13 @@ async def get_current_staff(
     staff_member = result.scalar_one_or_none()
     
     if staff_member:
-        print(f"✅ Staff encontrado pelo clerk_id: {staff_member.full_name}")
+        logger.debug("staff encontrado pelo clerk_id", extra={"staff_id": staff_member.id})
         return staff_member
     
-    print(f"⚠️ Staff não encontrado pelo clerk_id, tentando pelo email...")
+    logger.info(
+        "staff não encontrado pelo clerk_id, tentando pelo email",
+        extra={"clerk_user_id": current_user_id, "organization_id": current_org_id},
+    )
     
     # 2. Se não encontrou pelo clerk_id, busca pelo email
     user_email = await get_user_email_from_clerk(current_user_id)
@@ -95,14 +114,19 @@ async def get_current_staff(
         
         if staff_member:
             # 3. Encontrou! Atualiza o clerk_id
-            print(f"✅ Staff encontrado pelo email! Vinculando clerk_id...")
             staff_member.clerk_id = current_user_id
             await db.commit()
             await db.refresh(staff_member)
-            print(f"✅ Vinculado clerk_id {current_user_id} ao staff {staff_member.id} ({user_email})")
+            logger.info(
+                "clerk_id vinculado ao staff pelo email",
+                extra={"clerk_user_id": current_user_id, "staff_id": staff_member.id},
+            )
             return staff_member
         else:
-            print(f"❌ Nenhum staff encontrado com email={user_email} e clerk_id=NULL")
+            logger.warning(
+                "nenhum staff pendente com o email do usuário",
+                extra={"clerk_user_id": current_user_id, "organization_id": current_org_id},
+            )
     
     # 4. Não encontrou de nenhuma forma
     raise HTTPException(
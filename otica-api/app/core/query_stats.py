@@ -0,0 +1,133 @@
+"""Contagem e tempo de queries SQL por request (com detector de N+1)."""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Estatísticas das queries executadas durante um request."""
+    count: int = 0
+    total_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def total_time_ms(self) -> float:
+        return round(self.total_time * 1000, 2)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Registra um statement executado."""
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements (já parametrizados) que se repetiram mais que threshold vezes."""
+        return [
+            (statement, times)
+            for statement, times in self.statements.most_common()
+            if times > threshold
+        ]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def get_current_query_stats() -> Optional[QueryStats]:
+    """Retorna as estatísticas do request atual (None fora de um request)."""
+    return _current_stats.get()
+
+
+# ============================================
+# HOOKS DO ENGINE
+# ============================================
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Marca o início do statement na conexão."""
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Contabiliza o statement no request atual."""
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    stats.record(statement, time.perf_counter() - start_times.pop())
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI que coleta as estatísticas de SQL de cada request.
+
+    - Sempre loga contagem e tempo total (logger app.core.query_stats)
+    - Emite warning quando o mesmo statement se repete mais que
+      SQL_N_PLUS_ONE_THRESHOLD vezes (típico de N+1)
+    - Em DEBUG, adiciona os headers X-DB-Query-Count e X-DB-Query-Time-Ms
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-query-time-ms", str(stats.total_time_ms).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats) -> None:
+        if stats.count == 0:
+            return
+
+        route = f"{scope.get('method')} {scope.get('path')}"
+        logger.info(
+            "sql stats",
+            extra={
+                "route": route,
+                "db_query_count": stats.count,
+                "db_query_time_ms": stats.total_time_ms,
+            },
+        )
+
+        for statement, times in stats.repeated_statements(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "possível N+1: statement repetido %s vezes em %s",
+                times,
+                route,
+                extra={
+                    "route": route,
+                    "repeat_count": times,
+                    "statement": statement,
+                },
+            )
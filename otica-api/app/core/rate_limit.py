@@ -0,0 +1,175 @@
+"""Rate limiting em memória e load shedding para os endpoints públicos."""
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+
+
+class SlidingWindowLimiter:
+    """
+    Limite de `limit` eventos por `window` segundos por chave (IP, código...).
+
+    Usa o contador de janela deslizante aproximado: a contagem da janela
+    anterior entra com peso proporcional ao tempo que ainda se sobrepõe.
+    Memória O(1) por chave; as chaves menos recentes são descartadas acima de
+    `max_keys`. Estado por worker: com N workers o limite efetivo é até N x limit.
+    """
+
+    def __init__(self, name: str, limit: int, window: float, max_keys: int):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # chave -> [índice da janela, contagem atual, contagem anterior]
+        self._counters: OrderedDict[str, list] = OrderedDict()
+        # Métricas
+        self.allowed_total = 0
+        self.rejected_total = 0
+
+    def _counter(self, key: str, now: float) -> tuple[list, float]:
+        """Contador da chave avançado para a janela atual e a contagem estimada."""
+        index = int(now // self.window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [index, 0, 0]
+            self._counters[key] = counter
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        elif counter[0] != index:
+            counter[2] = counter[1] if counter[0] == index - 1 else 0
+            counter[1] = 0
+            counter[0] = index
+        self._counters.move_to_end(key)
+
+        overlap = 1 - (now % self.window) / self.window
+        return counter, counter[2] * overlap + counter[1]
+
+    def _retry_after(self, now: float) -> int:
+        return max(1, math.ceil(self.window - now % self.window))
+
+    def check(self, key: str) -> Optional[int]:
+        """Retry-After em segundos se a chave já estourou o limite, senão None (não conta)."""
+        now = time.monotonic()
+        _, estimate = self._counter(key, now)
+        if estimate >= self.limit:
+            self.rejected_total += 1
+            return self._retry_after(now)
+        return None
+
+    def add(self, key: str) -> None:
+        """Conta um evento para a chave."""
+        counter, _ = self._counter(key, time.monotonic())
+        counter[1] += 1
+
+    def hit(self, key: str) -> Optional[int]:
+        """Verifica e conta em um passo: Retry-After se rejeitado, senão None."""
+        now = time.monotonic()
+        counter, estimate = self._counter(key, now)
+        if estimate >= self.limit:
+            self.rejected_total += 1
+            return self._retry_after(now)
+        counter[1] += 1
+        self.allowed_total += 1
+        return None
+
+    def snapshot(self) -> dict:
+        """Estado atual para métricas."""
+        return {
+            "keys": len(self._counters),
+            "allowed_total": self.allowed_total,
+            "rejected_total": self.rejected_total,
+        }
+
+
+class LoadShedder:
+    """Limita requisições públicas simultâneas por worker (503 acima do limite)."""
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.shed_total = 0
+
+    def snapshot(self) -> dict:
+        """Estado atual para métricas."""
+        return {"in_flight": self.in_flight, "shed_total": self.shed_total}
+
+
+def _public_limiter(name: str, limit: int) -> SlidingWindowLimiter:
+    return SlidingWindowLimiter(
+        name,
+        limit,
+        window=settings.PUBLIC_RATE_LIMIT_WINDOW,
+        max_keys=settings.PUBLIC_RATE_LIMIT_MAX_KEYS,
+    )
+
+
+# Requisições por IP nos endpoints públicos
+ip_limiter = _public_limiter("public_ip", settings.PUBLIC_RATE_LIMIT_PER_IP)
+# Códigos inválidos por IP (força bruta do access_code)
+invalid_code_limiter = _public_limiter("public_invalid_code", settings.PUBLIC_INVALID_CODE_LIMIT_PER_IP)
+# Solicitações de acesso por código (spam contra uma organização)
+access_code_limiter = _public_limiter("public_access_code", settings.PUBLIC_RATE_LIMIT_PER_CODE)
+
+public_load_shedder = LoadShedder(settings.PUBLIC_MAX_IN_FLIGHT)
+
+
+def get_rate_limit_metrics() -> dict:
+    """Contadores dos limiters públicos e do load shedding."""
+    metrics = {
+        limiter.name: limiter.snapshot()
+        for limiter in (ip_limiter, invalid_code_limiter, access_code_limiter)
+    }
+    metrics["public_load_shedding"] = public_load_shedder.snapshot()
+    return metrics
+
+
+def client_ip(request: Request) -> str:
+    """IP do cliente; X-Forwarded-For só é usado atrás de proxy confiável."""
+    if settings.TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def too_many_requests(retry_after: int) -> HTTPException:
+    """Erro 429 com Retry-After."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Muitas requisições. Tente novamente em instantes.",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def enforce(limiter: SlidingWindowLimiter, key: str) -> None:
+    """Conta um evento para a chave ou levanta 429."""
+    retry_after = limiter.hit(key)
+    if retry_after is not None:
+        raise too_many_requests(retry_after)
+
+
+async def public_endpoint_guard(request: Request):
+    """
+    Dependency dos endpoints públicos: load shedding + limite por IP.
+
+    Declare antes de get_db: rejeita com 503/429 sem abrir sessão no banco.
+    Retorna o IP do cliente para limites adicionais no endpoint.
+    """
+    if public_load_shedder.in_flight >= public_load_shedder.max_in_flight:
+        public_load_shedder.shed_total += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": "1"}
+        )
+
+    ip = client_ip(request)
+    enforce(ip_limiter, ip)
+
+    public_load_shedder.in_flight += 1
+    try:
+        yield ip
+    finally:
+        public_load_shedder.in_flight -= 1
@@ -0,0 +1,42 @@
+"""Respostas JSON serializadas pelo pydantic_core (Rust) em vez de json.dumps."""
+from functools import lru_cache
+from typing import Any
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse padrão da aplicação (default_response_class em app/main.py).
+
+    Serializa com pydantic_core.to_json, que já entende datetime, enum, UUID
+    e models Pydantic sem passar pelo jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def model_response(response_type: Any, content: Any, status_code: int = 200) -> Response:
+    """
+    Valida `content` uma única vez contra `response_type` e devolve os bytes JSON.
+
+    Para endpoints que montam o resultado em dicts/ORM: evita que o
+    response_model da rota valide de novo (versões do FastAPI anteriores ao
+    caminho dump_json fazem model_dump + nova validação + json.dumps). O
+    response_model continua documentando o formato no OpenAPI.
+    """
+    adapter = _adapter(response_type)
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        media_type="application/json",
+    )
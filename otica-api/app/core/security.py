@@ -1,6 +1,6 @@
 """Segurança e autenticação com Clerk."""
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from jose.utils import base64url_decode
@@ -8,21 +8,66 @@ from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.backends import default_backend
 import base64
-import httpx
+import time
 from app.core.config import settings
+from app.core.metrics import observe_jwks_cache
+from app.core.tracing import set_span_attributes
+from app.services.clerk_service import clerk_request, jwks_breaker, ClerkUnavailableError
 
 
 security = HTTPBearer()
 
 
-async def get_jwks() -> dict:
-    """Busca as chaves públicas (JWKS) do Clerk."""
+# Cache do JWKS por worker: {"jwks": dict, "fetched_at": float}
+_jwks_cache: dict = {}
+
+# Intervalo mínimo entre recargas forçadas (kid desconhecido), para que tokens
+# com kid inventado não virem uma chamada ao Clerk por request
+JWKS_MIN_REFRESH_INTERVAL = 30.0
+
+
+async def get_jwks(force_refresh: bool = False) -> dict:
+    """
+    Busca as chaves públicas (JWKS) do Clerk.
+    
+    O resultado fica em cache por JWKS_CACHE_TTL segundos. Se o Clerk estiver
+    indisponível, o último JWKS válido continua sendo usado (stale-if-error).
+    
+    Raises:
+        ClerkUnavailableError: Clerk fora do ar e nenhum JWKS em cache
+    """
+    cached = _jwks_cache.get("jwks")
+    age = time.monotonic() - _jwks_cache.get("fetched_at", 0.0)
+    if cached and age < settings.JWKS_CACHE_TTL:
+        if not force_refresh or age < JWKS_MIN_REFRESH_INTERVAL:
+            observe_jwks_cache("hit")
+            return cached
+    
     jwks_url = f"{settings.CLERK_ISSUER}/.well-known/jwks.json"
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(jwks_url)
-        response.raise_for_status()
-        return response.json()
+    try:
+        response = await clerk_request(
+            "GET",
+            jwks_url,
+            operation="get_jwks",
+            idempotent=True,
+            breaker=jwks_breaker,
+            limiter=None,
+        )
+    except ClerkUnavailableError:
+        if cached:
+            observe_jwks_cache("stale")
+            return cached
+        raise
+    
+    if response.is_error:
+        observe_jwks_cache("error")
+    response.raise_for_status()
+    jwks = response.json()
+    observe_jwks_cache("refresh")
+    _jwks_cache["jwks"] = jwks
+    _jwks_cache["fetched_at"] = time.monotonic()
+    return jwks
 
 
 def jwk_to_pem(jwk: dict) -> str:
@@ -87,21 +132,36 @@ def get_public_key_pem(token: str, jwks: dict) -> Optional[str]:
         return None
 
 
-async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+async def verify_token(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
     """
     Valida o token JWT do Clerk e retorna o payload.
     
     Valida a assinatura do token usando as chaves públicas (JWKS) do Clerk.
+    Sub-requisições de /batch reaproveitam o token já validado na requisição
+    principal (request.state.token_data, definido só pelo servidor).
     
     Raises:
         HTTPException: 401 se token inválido, 403 se não tiver org_id
     """
+    token_data = getattr(request.state, "token_data", None)
+    if token_data is not None:
+        return token_data
+    
     token = credentials.credentials
     
     try:
         # Busca JWKS
         try:
             jwks = await get_jwks()
+        except ClerkUnavailableError as e:
+            # Falha do Clerk não é culpa do token: 503 em vez de 401
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Serviço de autenticação indisponível: {str(e)}"
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -127,6 +187,14 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
         # Obtém a chave pública PEM correspondente ao token
         public_key_pem = get_public_key_pem(token, jwks)
         
+        if not public_key_pem:
+            # Kid desconhecido: pode ser rotação de chave, recarrega o JWKS uma vez
+            try:
+                jwks = await get_jwks(force_refresh=True)
+            except ClerkUnavailableError:
+                pass
+            public_key_pem = get_public_key_pem(token, jwks)
+        
         if not public_key_pem:
             # Lista os kids disponíveis no JWKS para debug
             available_kids = [key.get("kid") for key in jwks.get("keys", [])]
@@ -190,6 +258,7 @@ async def get_current_org_id(
     Esta é a dependência principal usada em todas as rotas que precisam
     de isolamento multi-tenant.
     """
+    set_span_attributes({"tenant.org_id": token_data["org_id"], "enduser.id": token_data["user_id"] or ""})
     return token_data["org_id"]
 
 
@@ -0,0 +1,101 @@
+"""
+Tracing OpenTelemetry opcional (rotas FastAPI, SQL e chamadas httpx ao Clerk).
+
+Desligado por padrão (TRACING_ENABLED). Os pacotes ficam em
+requirements-tracing.txt; sem eles, ou com o tracing desligado, span() e
+set_span_attributes() são no-ops de custo desprezível.
+"""
+import contextlib
+import logging
+from typing import Optional
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Tracer ativo; None = tracing desligado
+_tracer = None
+_provider = None
+
+_NOOP_SPAN = contextlib.nullcontext()
+
+
+def span(name: str, attributes: Optional[dict] = None):
+    """Context manager de um span filho do atual (no-op sem tracing)."""
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.start_as_current_span(name, attributes=attributes)
+
+
+def set_span_attributes(attributes: dict) -> None:
+    """Adiciona atributos ao span atual (ex: tenant.org_id)."""
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+    trace.get_current_span().set_attributes(attributes)
+
+
+def _build_exporter():
+    """Exporter conforme TRACING_EXPORTER (otlp ou console)."""
+    if settings.TRACING_EXPORTER == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def setup_tracing(app, exporter=None) -> bool:
+    """
+    Instrumenta a aplicação (chamar na importação do app, antes do lifespan).
+
+    - Spans de servidor por rota (exceto /health e /metrics)
+    - Spans de cada statement SQL do engine
+    - Spans das chamadas httpx (cliente compartilhado do Clerk)
+    - Spans exportados em lote por thread própria (BatchSpanProcessor)
+
+    `exporter` substitui o configurado (ex: InMemorySpanExporter em testes).
+    Retorna False se o tracing estiver desligado ou os pacotes ausentes.
+    """
+    global _tracer, _provider
+    if not settings.TRACING_ENABLED:
+        return False
+
+    try:
+        from opentelemetry import trace
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    except ImportError:
+        logger.warning("TRACING_ENABLED sem os pacotes do OpenTelemetry (requirements-tracing.txt); tracing desligado")
+        return False
+
+    from app.core.database import engine
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter or _build_exporter()))
+    trace.set_tracer_provider(_provider)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_provider, excluded_urls="/health,/metrics")
+    SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine, tracer_provider=_provider)
+    HTTPXClientInstrumentor().instrument(tracer_provider=_provider)
+
+    _tracer = trace.get_tracer("app", tracer_provider=_provider)
+    logger.info(
+        "tracing habilitado",
+        extra={"exporter": settings.TRACING_EXPORTER, "sample_ratio": settings.TRACING_SAMPLE_RATIO},
+    )
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Exporta os spans pendentes (fim do lifespan)."""
+    if _provider is not None:
+        _provider.shutdown()
@@ -1,8 +1,59 @@
 """Aplicação FastAPI principal."""
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.routers.v1 import staff, stores, departments, access_requests, invitations
+from app.core.logging_config import setup_logging, shutdown_logging, RequestIdMiddleware
+from app.core.http_client import start_http_client, close_http_client
+from app.core.idempotency import run_cleanup as run_idempotency_cleanup
+from app.services.invitation_outbox import run_dispatcher
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.core.metrics import PrometheusMiddleware, render_metrics, run_sync as run_metrics_sync, sync_runtime_metrics
+from app.core.responses import FastJSONResponse
+from app.routers.v1 import staff, stores, departments, access_requests, invitations, me, batch
+
+
+setup_logging()
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Recursos compartilhados pela aplicação inteira."""
+    await start_http_client()
+    
+    # Dispatcher do outbox de convites (precisa da CLERK_SECRET_KEY)
+    dispatcher = None
+    if settings.INVITATION_OUTBOX_DISPATCHER_ENABLED and settings.CLERK_SECRET_KEY:
+        dispatcher = asyncio.create_task(run_dispatcher())
+    
+    # Limpeza periódica das Idempotency-Keys expiradas
+    idempotency_cleanup = asyncio.create_task(run_idempotency_cleanup())
+    
+    # Contadores em memória → métricas Prometheus
+    metrics_sync = None
+    if settings.METRICS_ENABLED:
+        metrics_sync = asyncio.create_task(run_metrics_sync())
+    
+    try:
+        yield
+    finally:
+        for task in (dispatcher, idempotency_cleanup, metrics_sync):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        await close_http_client()
+        shutdown_tracing()
+        shutdown_logging()
 
 
 app = FastAPI(
@@ -11,6 +62,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS
@@ -22,12 +75,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Estatísticas de SQL por request
+app.add_middleware(QueryStatsMiddleware)
+
+# Request id nos logs e no header X-Request-ID
+app.add_middleware(RequestIdMiddleware)
+
+# Compressão gzip/brotli (mais externo: comprime a resposta final)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Métricas HTTP (mais externo: mede a requisição inteira)
+if settings.METRICS_ENABLED:
+    if not settings.METRICS_TOKEN:
+        logger.warning("METRICS_ENABLED sem METRICS_TOKEN: /metrics não será exposto")
+    app.add_middleware(PrometheusMiddleware)
+
+# Tracing OpenTelemetry (no-op se TRACING_ENABLED=false)
+setup_tracing(app)
+
 # Routers
 app.include_router(staff.router, prefix="/api/v1")
 app.include_router(stores.router, prefix="/api/v1")
 app.include_router(departments.router, prefix="/api/v1")
 app.include_router(access_requests.router, prefix="/api/v1")
 app.include_router(invitations.router, prefix="/api/v1")
+app.include_router(me.router, prefix="/api/v1")
+app.include_router(batch.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -45,3 +119,19 @@ async def health():
     """Health check."""
     return {"status": "ok"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas Prometheus (exige METRICS_TOKEN como Bearer)."""
+    # Sem token configurado o endpoint não é exposto
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not secrets.compare_digest(request.headers.get("authorization", "").encode(), expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+    
+    sync_runtime_metrics()
+    # Com multiprocess a leitura dos arquivos dos workers é I/O de disco
+    content, media_type = await run_in_threadpool(render_metrics)
+    return Response(content=content, media_type=media_type)
@@ -5,6 +5,8 @@ from app.models.organization_model import Organization
 from app.models.store_model import Store
 from app.models.department_model import Department
 from app.models.access_request_model import AccessRequest, AccessRequestStatus
+from app.models.invitation_outbox_model import InvitationOutbox, InvitationOutboxStatus
+from app.models.idempotency_key_model import IdempotencyKey
 
 __all__ = [
     "BaseModel",
@@ -15,4 +17,7 @@ __all__ = [
     "Department",
     "AccessRequest",
     "AccessRequestStatus",
+    "InvitationOutbox",
+    "InvitationOutboxStatus",
+    "IdempotencyKey",
 ]
@@ -0,0 +1,30 @@
+"""Model de IdempotencyKey (respostas gravadas para o header Idempotency-Key)."""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, Index, UniqueConstraint
+from app.models.base_class import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """
+    Chave de idempotência enviada pelo cliente em POSTs que criam registros.
+    
+    Enquanto status_code é NULL a requisição original ainda está em
+    processamento; depois disso a resposta gravada é devolvida nas repetições.
+    Linhas expiradas são removidas pela limpeza em app/core/idempotency.py.
+    """
+    
+    __tablename__ = "idempotency_keys"
+    
+    organization_id = Column(String, nullable=False, doc="ID da organização no Clerk (org_xxx)")
+    user_id = Column(String, nullable=False, doc="clerk_id de quem fez a requisição")
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False, doc="SHA-256 de método, path, query e body")
+    
+    status_code = Column(Integer, nullable=True)
+    media_type = Column(String(100), nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('organization_id', 'user_id', 'key', name='uq_idempotency_keys_scope_key'),
+        Index('idx_idempotency_keys_expires_at', 'expires_at'),
+    )
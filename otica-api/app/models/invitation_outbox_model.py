@@ -0,0 +1,50 @@
+"""Model de InvitationOutbox (convites do Clerk pendentes de envio)."""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.sql import func
+from app.models.base_class import BaseModel
+import enum
+
+
+class InvitationOutboxStatus(str, enum.Enum):
+    """Status de um convite no outbox."""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class InvitationOutbox(BaseModel):
+    """
+    Outbox transacional de convites do Clerk.
+
+    A linha é gravada na mesma transação que cria o StaffMember; o envio ao
+    Clerk é feito depois pelo dispatcher (app/services/invitation_outbox.py).
+    """
+
+    __tablename__ = "invitation_outbox"
+
+    organization_id = Column(String, nullable=False, doc="ID da organização no Clerk (org_xxx)")
+    staff_id = Column(Integer, ForeignKey("staff_members.id", ondelete="CASCADE"), nullable=True)
+    email = Column(String, nullable=False)
+    clerk_role = Column(String(50), nullable=False, doc="Role na organização do Clerk (org:admin, org:member)")
+
+    status = Column(
+        Enum(InvitationOutboxStatus, name="invitation_outbox_status"),
+        default=InvitationOutboxStatus.PENDING,
+        nullable=False
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    # Próxima tentativa; em PROCESSING funciona como lease (reclamado de novo se o worker cair)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    invitation_id = Column(String, nullable=True, doc="ID do convite criado no Clerk")
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Fila do dispatcher: só linhas ainda não concluídas
+        Index(
+            'idx_invitation_outbox_due',
+            'next_attempt_at',
+            postgresql_where=text("status IN ('PENDING', 'PROCESSING')"),
+        ),
+    )
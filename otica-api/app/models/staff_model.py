@@ -1,5 +1,5 @@
 """Model de Staff (Equipe)."""
-from sqlalchemy import Column, Integer, String, Boolean, Enum, Index, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Enum, Index, ForeignKey, text
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base_class import BaseModel
@@ -41,5 +41,10 @@ class StaffMember(BaseModel):
         # Garante email único DENTRO da mesma organização
         Index('idx_staff_org_email', 'organization_id', 'email', unique=True),
         Index('idx_staff_org_role', 'organization_id', 'role'),
+        # Filtros por loja/setor na listagem de staff
+        Index('idx_staff_org_store', 'organization_id', 'store_id'),
+        Index('idx_staff_org_department', 'organization_id', 'department_id'),
+        # Lookup de get_current_staff (sempre com is_active = true)
+        Index('idx_staff_clerk_org_active', 'clerk_id', 'organization_id', postgresql_where=text('is_active')),
     )
 
@@ -1,5 +1,5 @@
 """Model de Store (Loja)."""
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base_class import BaseModel
 
@@ -17,4 +17,8 @@ class Store(BaseModel):
     
     # Relationships
     organization = relationship("Organization", backref="stores")
-
+    
+    __table_args__ = (
+        # Partial index: listagens filtram sempre is_active e não crescem com o histórico de soft delete
+        Index('idx_stores_org_name_active', 'organization_id', 'name', postgresql_where=text('is_active')),
+    )
@@ -1,17 +1,29 @@
 """Endpoints para gestão de AccessRequests (Solicitações de Acesso)."""
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from pydantic_core import to_json
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import literal, null, select, union_all
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.idempotency import IdempotentRoute, idempotency_key
+from app.core.rate_limit import (
+    access_code_limiter,
+    enforce,
+    invalid_code_limiter,
+    public_endpoint_guard,
+    too_many_requests
+)
+from app.core.fast_read import FIELDS_QUERY, fetch_json_response, schema_columns, sparse_columns
 from app.core.security import get_current_org_id
+from app.core.tracing import span
 from app.core.permissions import require_admin
 from app.models.access_request_model import AccessRequest, AccessRequestStatus
 from app.models.organization_model import Organization
 from app.models.store_model import Store
 from app.models.department_model import Department
-from app.models.staff_model import StaffMember, StaffRole
+from app.models.staff_model import StaffMember
 from app.schemas.access_request_schema import (
     AccessRequestCreate,
     AccessRequestApprove,
@@ -19,10 +31,24 @@ from app.schemas.access_request_schema import (
     AccessRequestResponse,
     AccessRequestWithOrg
 )
-from app.services.clerk_service import get_clerk_service, ClerkService
+from app.services.invitation_outbox import enqueue_invitation, notify_dispatcher
+from app.services.public_org_cache import public_org_cache
+
 
+# Colunas de AccessRequestWithOrg usadas pela listagem (caminho Core, sem ORM)
+LIST_COLUMNS = [
+    *schema_columns(AccessRequest, AccessRequestWithOrg),
+    AccessRequest.created_at.label("requested_at"),
+    Store.name.label("store_name"),
+    Department.name.label("department_name"),
+    null().label("organization_name"),
+]
 
-router = APIRouter(prefix="/access-requests", tags=["access-requests"])
+# Limites do access_code (mesmos de AccessRequestCreate)
+ACCESS_CODE_MIN_LENGTH = 6
+ACCESS_CODE_MAX_LENGTH = 20
+
+router = APIRouter(prefix="/access-requests", tags=["access-requests"], route_class=IdempotentRoute)
 
 
 # ============================================
@@ -32,15 +58,23 @@ router = APIRouter(prefix="/access-requests", tags=["access-requests"])
 @router.post("/public", response_model=AccessRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_access_request(
     request_data: AccessRequestCreate,
+    ip: str = Depends(public_endpoint_guard),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Cria uma solicitação de acesso (endpoint PÚBLICO).
     
     O usuário precisa fornecer o código de acesso da organização.
+    Limitado por IP, por código e por tentativas com código inválido (429).
     
     **Autenticação**: Não requer (público)
     """
+    # Limites checados antes de qualquer consulta ao banco
+    retry_after = invalid_code_limiter.check(ip)
+    if retry_after is not None:
+        raise too_many_requests(retry_after)
+    enforce(access_code_limiter, request_data.access_code)
+    
     # Busca organização pelo código de acesso
     result = await db.execute(
         select(Organization).where(
@@ -51,6 +85,7 @@ async def create_access_request(
     org = result.scalar_one_or_none()
     
     if not org:
+        invalid_code_limiter.add(ip)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Código de acesso inválido"
@@ -129,54 +164,80 @@ async def create_access_request(
     return new_request
 
 
+async def load_public_org_info(db: AsyncSession, code: str) -> tuple[int | None, bytes | None]:
+    """Carrega nome, lojas e setores ativos de um código (None se não existir)."""
+    result = await db.execute(
+        select(Organization.id, Organization.name).where(
+            Organization.access_code == code,
+            Organization.is_active == True
+        )
+    )
+    org = result.one_or_none()
+    
+    if not org:
+        return None, None
+    
+    # Lojas e setores em um único round trip
+    options = union_all(
+        select(literal("store").label("kind"), Store.id, Store.name).where(
+            Store.organization_id == org.id,
+            Store.is_active == True
+        ),
+        select(literal("department").label("kind"), Department.id, Department.name).where(
+            Department.organization_id == org.id,
+            Department.is_active == True
+        ),
+    ).subquery()
+    rows = (await db.execute(select(options).order_by(options.c.name))).all()
+    
+    body = to_json({
+        "organization_name": org.name,
+        "stores": [{"id": r.id, "name": r.name} for r in rows if r.kind == "store"],
+        "departments": [{"id": r.id, "name": r.name} for r in rows if r.kind == "department"]
+    })
+    return org.id, body
+
+
 @router.get("/public/validate-code")
 async def validate_access_code(
     code: str = Query(..., description="Código de acesso da organização"),
+    ip: str = Depends(public_endpoint_guard),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Valida um código de acesso e retorna info básica da organização (PÚBLICO).
     
     Usado no frontend para mostrar o nome da organização antes de preencher o form.
+    A resposta fica em cache no worker (inclusive códigos inválidos), então
+    chamadas repetidas não abrem sessão no banco. Limitado por IP e por
+    tentativas com código inválido (429).
     
     **Autenticação**: Não requer (público)
     """
-    result = await db.execute(
-        select(Organization).where(
-            Organization.access_code == code,
-            Organization.is_active == True
-        )
-    )
-    org = result.scalar_one_or_none()
-    
-    if not org:
+    # Fora do tamanho de um código válido: nem consulta cache/banco
+    if not ACCESS_CODE_MIN_LENGTH <= len(code) <= ACCESS_CODE_MAX_LENGTH:
+        entry = None
+    else:
+        # IP que já errou códigos demais não chega ao banco (força bruta)
+        retry_after = invalid_code_limiter.check(ip)
+        if retry_after is not None:
+            raise too_many_requests(retry_after)
+        entry = await public_org_cache.get_or_load(code, lambda: load_public_org_info(db, code))
+        if entry.body is None:
+            invalid_code_limiter.add(ip)
+    
+    if entry is None or entry.body is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Código de acesso inválido"
+            detail="Código de acesso inválido",
+            headers={"Cache-Control": f"public, max-age={int(settings.PUBLIC_ORG_NEGATIVE_CACHE_TTL)}"}
         )
     
-    # Busca lojas e setores da organização para o form
-    stores_result = await db.execute(
-        select(Store).where(
-            Store.organization_id == org.id,
-            Store.is_active == True
-        )
-    )
-    stores = stores_result.scalars().all()
-    
-    depts_result = await db.execute(
-        select(Department).where(
-            Department.organization_id == org.id,
-            Department.is_active == True
-        )
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={int(settings.PUBLIC_ORG_CACHE_TTL)}"}
     )
-    departments = depts_result.scalars().all()
-    
-    return {
-        "organization_name": org.name,
-        "stores": [{"id": s.id, "name": s.name} for s in stores],
-        "departments": [{"id": d.id, "name": d.name} for d in departments]
-    }
 
 
 # ============================================
@@ -203,6 +264,7 @@ async def get_org_internal_id(
 @router.get("", response_model=List[AccessRequestWithOrg])
 async def list_access_requests(
     status_filter: AccessRequestStatus = Query(None, description="Filtrar por status"),
+    fields: Optional[str] = FIELDS_QUERY,
     db: AsyncSession = Depends(get_db),
     current_org_id: str = Depends(get_current_org_id),
     current_staff: StaffMember = Depends(require_admin),
@@ -210,57 +272,32 @@ async def list_access_requests(
     """
     Lista solicitações de acesso da organização atual.
     
+    Com fields=id,full_name,status só essas colunas são lidas e retornadas
+    (ex: sem o texto livre de message).
+    
     **Permissões**: ADMIN apenas
     """
+    columns = sparse_columns(LIST_COLUMNS, fields)
+    selected = {column.key for column in columns}
     org_id = await get_org_internal_id(db, current_org_id)
     
-    query = select(AccessRequest).where(AccessRequest.organization_id == org_id)
+    # Nomes de loja e setor no mesmo SELECT (evita N+1 por solicitação);
+    # os JOINs só entram se esses campos foram pedidos
+    query = select(*columns).select_from(AccessRequest)
+    if "store_name" in selected:
+        query = query.outerjoin(Store, AccessRequest.store_id == Store.id)
+    if "department_name" in selected:
+        query = query.outerjoin(Department, AccessRequest.department_id == Department.id)
+    
+    query = query.where(AccessRequest.organization_id == org_id)
     
     if status_filter:
         query = query.where(AccessRequest.status == status_filter)
     
-    query = query.order_by(AccessRequest.requested_at.desc())
-    
-    result = await db.execute(query)
-    requests = result.scalars().all()
-    
-    # Enriquece com nomes
-    enriched = []
-    for req in requests:
-        req_dict = {
-            "id": req.id,
-            "organization_id": req.organization_id,
-            "store_id": req.store_id,
-            "department_id": req.department_id,
-            "full_name": req.full_name,
-            "email": req.email,
-            "message": req.message,
-            "status": req.status,
-            "assigned_role": req.assigned_role,
-            "requested_at": req.created_at,
-            "reviewed_at": req.reviewed_at,
-            "reviewed_by": req.reviewed_by,
-            "rejection_reason": req.rejection_reason,
-            "store_name": None,
-            "department_name": None,
-            "organization_name": None
-        }
-        
-        if req.store_id:
-            store_result = await db.execute(select(Store).where(Store.id == req.store_id))
-            store = store_result.scalar_one_or_none()
-            if store:
-                req_dict["store_name"] = store.name
-        
-        if req.department_id:
-            dept_result = await db.execute(select(Department).where(Department.id == req.department_id))
-            dept = dept_result.scalar_one_or_none()
-            if dept:
-                req_dict["department_name"] = dept.name
-        
-        enriched.append(AccessRequestWithOrg(**req_dict))
+    query = query.order_by(AccessRequest.created_at.desc())
     
-    return enriched
+    # Colunas direto para JSON, sem hidratar entidades nem revalidar
+    return await fetch_json_response(db, query)
 
 
 @router.get("/{request_id}", response_model=AccessRequestWithOrg)
@@ -294,22 +331,24 @@ async def get_access_request(
     return request
 
 
-@router.post("/{request_id}/approve", response_model=dict)
+@router.post("/{request_id}/approve", response_model=dict, dependencies=[Depends(idempotency_key)])
 async def approve_access_request(
     request_id: int,
     approve_data: AccessRequestApprove,
     db: AsyncSession = Depends(get_db),
     current_org_id: str = Depends(get_current_org_id),
     current_staff: StaffMember = Depends(require_admin),
-    clerk_service: ClerkService = Depends(get_clerk_service),
 ):
     """
     Aprova uma solicitação de acesso.
     
-    1. Cria convite no Clerk (envia email automático)
-    2. Cria StaffMember no banco
+    1. Cria StaffMember no banco
+    2. Registra o convite do Clerk no outbox (mesma transação)
     3. Atualiza status da solicitação
     
+    O convite (email automático do Clerk) é enviado em background pelo
+    dispatcher do outbox, então a resposta não espera a latência do Clerk.
+    
     **Permissões**: ADMIN apenas
     """
     org_id = await get_org_internal_id(db, current_org_id)
@@ -341,20 +380,8 @@ async def approve_access_request(
             detail=f"Solicitação já foi {request.status.value}"
         )
     
-    # Mapeia role para Clerk role
-    clerk_role = "org:member"
-    if approve_data.assigned_role == StaffRole.ADMIN:
-        clerk_role = "org:admin"
-    
     try:
-        # 1. Cria convite no Clerk
-        invitation = await clerk_service.create_user_invitation(
-            email=request.email,
-            organization_id=org.clerk_org_id,
-            role=clerk_role
-        )
-        
-        # 2. Cria StaffMember no banco (clerk_id será preenchido quando o usuário aceitar)
+        # 1. Cria StaffMember no banco (clerk_id será preenchido quando o usuário aceitar)
         new_staff = StaffMember(
             organization_id=org.clerk_org_id,
             store_id=request.store_id,
@@ -366,6 +393,16 @@ async def approve_access_request(
             clerk_id=None  # Será atualizado via webhook ou no primeiro login
         )
         db.add(new_staff)
+        await db.flush()
+        
+        # 2. Convite no outbox (enviado ao Clerk pelo dispatcher)
+        enqueue_invitation(
+            db,
+            organization_id=org.clerk_org_id,
+            email=request.email,
+            role=approve_data.assigned_role,
+            staff_id=new_staff.id,
+        )
         
         # 3. Atualiza a solicitação
         request.status = AccessRequestStatus.APPROVED
@@ -373,12 +410,15 @@ async def approve_access_request(
         request.reviewed_at = datetime.utcnow().isoformat()
         request.reviewed_by = current_staff.id
         
-        await db.commit()
+        with span("db.commit"):
+            await db.commit()
+        notify_dispatcher()
         
         return {
-            "message": "Solicitação aprovada com sucesso. Um email foi enviado para o usuário.",
+            "message": "Solicitação aprovada com sucesso. O convite será enviado por email em instantes.",
             "staff_id": new_staff.id,
-            "invitation_id": invitation.get("id")
+            "invitation_id": None,
+            "invitation_status": "pending"
         }
         
     except Exception as e:
@@ -0,0 +1,174 @@
+"""Endpoint /batch: várias chamadas à API v1 em uma única requisição HTTP."""
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic_core import from_json, to_json
+from app.core.config import settings
+from app.core.logging_config import REQUEST_ID_HEADER, get_request_id
+from app.core.permissions import get_current_staff
+from app.core.security import verify_token
+from app.models.staff_model import StaffMember
+from app.schemas.batch_schema import BatchRequest, BatchSubRequest, BatchSubResponse, BatchResponse
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+API_PREFIX = "/api/v1/"
+
+# Headers do cliente que não podem ser sobrescritos pela sub-requisição
+PROTECTED_HEADERS = {"authorization", "host", "content-length", "content-type", "accept-encoding", REQUEST_ID_HEADER}
+
+# Headers da sub-resposta devolvidos no resultado
+FORWARDED_RESPONSE_HEADERS = {
+    "content-type",
+    "etag",
+    "cache-control",
+    "location",
+    "retry-after",
+    "idempotent-replayed",
+}
+
+
+def build_sub_scope(request: Request, sub: BatchSubRequest, state: dict, body: bytes) -> dict:
+    """Scope ASGI da sub-requisição, herdando conexão e Authorization do batch."""
+    path, _, query = sub.path.partition("?")
+    headers = [(b"authorization", request.headers.get("authorization", "").encode())]
+    # Sub-requisições logam com o request id do batch
+    request_id = get_request_id()
+    if request_id:
+        headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+    headers += [
+        (name.lower().encode(), value.encode())
+        for name, value in sub.headers.items()
+        if name.lower() not in PROTECTED_HEADERS
+    ]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode()))
+
+    return {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": dict(state),
+    }
+
+
+async def run_sub_request(request: Request, sub: BatchSubRequest, state: dict) -> BatchSubResponse:
+    """Executa uma sub-requisição pela aplicação inteira (middlewares e exception handlers)."""
+    body = to_json(sub.body) if sub.body is not None else b""
+    scope = build_sub_scope(request, sub, state, body)
+
+    received = False
+
+    async def receive() -> dict:
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Depois do corpo só resta a "desconexão" (nunca chega antes do fim)
+        await asyncio.Event().wait()
+
+    status_code = 500
+    response_headers = {}
+    chunks = []
+
+    async def send(message: dict) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode().lower()
+                if name in FORWARDED_RESPONSE_HEADERS:
+                    response_headers[name] = value.decode()
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware já respondeu 500 e relança a exceção: a falha
+        # fica restrita a esta sub-requisição
+        logger.exception("erro não tratado na sub-requisição %s %s do batch", sub.method, sub.path)
+        return BatchSubResponse(
+            id=sub.id,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            headers={},
+            body={"detail": "Erro interno na sub-requisição"},
+        )
+
+    content = b"".join(chunks)
+    if not content:
+        body_value = None
+    elif response_headers.get("content-type", "").startswith("application/json"):
+        body_value = from_json(content)
+    else:
+        body_value = content.decode("utf-8", errors="replace")
+
+    return BatchSubResponse(id=sub.id, status=status_code, headers=response_headers, body=body_value)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    token_data: dict = Depends(verify_token),
+    current_staff: StaffMember = Depends(get_current_staff),
+):
+    """
+    Executa várias chamadas à API v1 em uma única requisição.
+
+    - Token e staff são resolvidos uma vez e reaproveitados por todas as
+      sub-requisições (cada uma mantém suas próprias permissões por role)
+    - GETs consecutivos rodam em paralelo (até BATCH_MAX_CONCURRENCY);
+      POST/PUT/PATCH/DELETE rodam na ordem, separando os grupos de GETs
+    - Cada resultado traz seu próprio status; falha de uma sub-requisição
+      não interrompe as demais
+
+    **Permissões**: qualquer membro ativo (cada sub-requisição aplica as suas)
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {settings.BATCH_MAX_REQUESTS} sub-requisições por batch"
+        )
+
+    for sub in batch.requests:
+        if not sub.path.startswith(API_PREFIX) or sub.path.startswith(f"{API_PREFIX}batch"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Path inválido no batch: {sub.path}"
+            )
+
+    state = {"token_data": token_data, "current_staff": current_staff}
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+    async def run_limited(sub: BatchSubRequest) -> BatchSubResponse:
+        async with semaphore:
+            return await run_sub_request(request, sub, state)
+
+    responses = []
+    pending_gets = []
+    for sub in batch.requests + [None]:
+        if sub is not None and sub.method == "GET":
+            pending_gets.append(sub)
+            continue
+        # Escrita (ou fim da lista): executa antes os GETs acumulados
+        if pending_gets:
+            responses.extend(await asyncio.gather(*(run_limited(get) for get in pending_gets)))
+            pending_gets = []
+        if sub is not None:
+            responses.append(await run_sub_request(request, sub, state))
+
+    return BatchResponse(responses=responses)
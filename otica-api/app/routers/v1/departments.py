@@ -1,19 +1,25 @@
 """Endpoints para gestão de Departments (Setores)."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
+from app.core.etag import collection_etag, etag_matches, not_modified, set_etag, table_version
+from app.core.fast_read import FIELDS_QUERY, fetch_json_response, schema_columns, sparse_columns
 from app.core.security import get_current_org_id
 from app.core.permissions import require_admin, require_staff_or_above
 from app.models.department_model import Department
 from app.models.organization_model import Organization
 from app.models.staff_model import StaffMember
 from app.schemas.department_schema import DepartmentCreate, DepartmentUpdate, DepartmentResponse
+from app.services.public_org_cache import public_org_cache
 
 
 router = APIRouter(prefix="/departments", tags=["departments"])
 
+# Colunas de DepartmentResponse usadas pela listagem (caminho Core, sem ORM)
+LIST_COLUMNS = schema_columns(Department, DepartmentResponse)
+
 
 async def get_org_internal_id(
     db: AsyncSession,
@@ -34,6 +40,8 @@ async def get_org_internal_id(
 
 @router.get("", response_model=List[DepartmentResponse])
 async def list_departments(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
     db: AsyncSession = Depends(get_db),
     current_org_id: str = Depends(get_current_org_id),
     current_staff: StaffMember = Depends(require_staff_or_above),
@@ -42,18 +50,30 @@ async def list_departments(
     Lista todos os setores da organização atual.
     
     **Permissões**: STAFF, MANAGER ou ADMIN
+    
+    Responde com ETag; com If-None-Match igual devolve 304 sem corpo.
+    Com fields=id,name só essas colunas são lidas e retornadas.
     """
+    columns = sparse_columns(LIST_COLUMNS, fields)
     org_id = await get_org_internal_id(db, current_org_id)
     
-    result = await db.execute(
-        select(Department).where(
+    # GET condicional: 304 sem ler nem serializar as linhas
+    etag = await collection_etag(
+        db, request, current_org_id,
+        table_version(Department, Department.organization_id == org_id),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Leitura somente de colunas (sem hidratar entidades), direto para JSON
+    response = await fetch_json_response(
+        db,
+        select(*columns).where(
             Department.organization_id == org_id,
             Department.is_active == True
-        )
+        ).order_by(Department.name)
     )
-    departments = result.scalars().all()
-    
-    return departments
+    return set_etag(response, etag)
 
 
 @router.get("/{department_id}", response_model=DepartmentResponse)
@@ -121,6 +141,7 @@ async def create_department(
     
     db.add(new_department)
     await db.commit()
+    public_org_cache.invalidate_org(org_id)
     await db.refresh(new_department)
     
     return new_department
@@ -161,6 +182,7 @@ async def update_department(
         setattr(department, field, value)
     
     await db.commit()
+    public_org_cache.invalidate_org(org_id)
     await db.refresh(department)
     
     return department
@@ -196,4 +218,5 @@ async def delete_department(
     
     department.is_active = False
     await db.commit()
+    public_org_cache.invalidate_org(org_id)
 
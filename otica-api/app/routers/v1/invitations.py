@@ -1,19 +1,28 @@
 """Endpoints para convites diretos de usuários (Admin)."""
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import String, cast, literal, select, union_all
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.idempotency import IdempotentRoute, idempotency_key
 from app.core.security import get_current_org_id
 from app.core.permissions import require_admin
 from app.models.organization_model import Organization
 from app.models.store_model import Store
 from app.models.department_model import Department
-from app.models.staff_model import StaffMember, StaffRole
-from app.schemas.staff_schema import StaffInvite, StaffResponse
-from app.services.clerk_service import get_clerk_service, ClerkService
+from app.models.staff_model import StaffMember
+from app.schemas.staff_schema import (
+    StaffInvite,
+    StaffResponse,
+    StaffBulkInvite,
+    StaffBulkInviteResult,
+    StaffBulkInviteResponse
+)
+from app.services.clerk_service import get_clerk_service, ClerkService, ClerkUnavailableError
+from app.services.invitation_outbox import enqueue_invitation, notify_dispatcher, clerk_role_for
 
 
-router = APIRouter(prefix="/invitations", tags=["invitations"])
+router = APIRouter(prefix="/invitations", tags=["invitations"], route_class=IdempotentRoute)
 
 
 async def get_org_data(
@@ -33,19 +42,19 @@ async def get_org_data(
     return org
 
 
-@router.post("", response_model=dict, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=dict, status_code=status.HTTP_201_CREATED, dependencies=[Depends(idempotency_key)])
 async def invite_user(
     invite_data: StaffInvite,
     db: AsyncSession = Depends(get_db),
     current_org_id: str = Depends(get_current_org_id),
     current_staff: StaffMember = Depends(require_admin),
-    clerk_service: ClerkService = Depends(get_clerk_service),
 ):
     """
     Convida um novo usuário diretamente (sem solicitação).
     
     O admin preenche o formulário e o usuário recebe um email
-    para definir sua senha.
+    para definir sua senha. O convite vai para o outbox e é enviado
+    ao Clerk em background.
     
     **Permissões**: ADMIN apenas
     """
@@ -92,20 +101,8 @@ async def invite_user(
                 detail="Setor não encontrado"
             )
     
-    # Mapeia role para Clerk role
-    clerk_role = "org:member"
-    if invite_data.role == StaffRole.ADMIN:
-        clerk_role = "org:admin"
-    
     try:
-        # 1. Cria convite no Clerk
-        invitation = await clerk_service.create_user_invitation(
-            email=invite_data.email,
-            organization_id=org.clerk_org_id,
-            role=clerk_role
-        )
-        
-        # 2. Cria StaffMember no banco
+        # 1. Cria StaffMember no banco
         new_staff = StaffMember(
             organization_id=current_org_id,
             store_id=invite_data.store_id,
@@ -117,13 +114,25 @@ async def invite_user(
             clerk_id=None  # Será atualizado quando aceitar o convite
         )
         db.add(new_staff)
+        await db.flush()
+        
+        # 2. Convite no outbox, na mesma transação (enviado pelo dispatcher)
+        enqueue_invitation(
+            db,
+            organization_id=org.clerk_org_id,
+            email=invite_data.email,
+            role=invite_data.role,
+            staff_id=new_staff.id,
+        )
+        
         await db.commit()
-        await db.refresh(new_staff)
+        notify_dispatcher()
         
         return {
-            "message": "Convite enviado com sucesso!",
+            "message": "Convite registrado! O email será enviado em instantes.",
             "staff_id": new_staff.id,
-            "invitation_id": invitation.get("id"),
+            "invitation_id": None,
+            "invitation_status": "pending",
             "email": invite_data.email
         }
         
@@ -135,6 +144,123 @@ async def invite_user(
         )
 
 
+@router.post("/bulk", response_model=StaffBulkInviteResponse, status_code=status.HTTP_201_CREATED)
+async def invite_users_bulk(
+    bulk_data: StaffBulkInvite,
+    db: AsyncSession = Depends(get_db),
+    current_org_id: str = Depends(get_current_org_id),
+    current_staff: StaffMember = Depends(require_admin),
+):
+    """
+    Convida vários usuários de uma vez (ex: equipe de uma loja nova).
+    
+    O lote é validado em uma única query (emails já cadastrados, lojas e
+    setores), os StaffMembers válidos são inseridos juntos e os convites vão
+    para o outbox, enviados ao Clerk com concorrência limitada
+    (INVITATION_OUTBOX_CONCURRENCY). Retorna o resultado por email.
+    
+    **Permissões**: ADMIN apenas
+    """
+    invites = bulk_data.invitations
+    if len(invites) > settings.INVITATION_BULK_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {settings.INVITATION_BULK_MAX_SIZE} convites por requisição"
+        )
+    
+    org = await get_org_data(db, current_org_id)
+    
+    emails = {invite.email for invite in invites}
+    store_ids = {invite.store_id for invite in invites if invite.store_id}
+    department_ids = {invite.department_id for invite in invites if invite.department_id}
+    
+    # Validação do lote inteiro em uma query
+    checks = union_all(
+        select(literal("email").label("kind"), StaffMember.email.label("value")).where(
+            StaffMember.organization_id == current_org_id,
+            StaffMember.email.in_(emails)
+        ),
+        select(literal("store"), cast(Store.id, String)).where(
+            Store.organization_id == org.id,
+            Store.id.in_(store_ids)
+        ),
+        select(literal("department"), cast(Department.id, String)).where(
+            Department.organization_id == org.id,
+            Department.id.in_(department_ids)
+        ),
+    )
+    found = {(kind, value) for kind, value in (await db.execute(checks)).all()}
+    
+    results: list[StaffBulkInviteResult] = []
+    to_create: list[tuple[StaffBulkInviteResult, StaffMember]] = []
+    seen_emails = set()
+    
+    for invite in invites:
+        error = None
+        if invite.email in seen_emails:
+            error = "Email repetido no lote"
+        elif ("email", invite.email) in found:
+            error = "Email já cadastrado nesta organização"
+        elif invite.store_id and ("store", str(invite.store_id)) not in found:
+            error = "Loja não encontrada"
+        elif invite.department_id and ("department", str(invite.department_id)) not in found:
+            error = "Setor não encontrado"
+        seen_emails.add(invite.email)
+        
+        result = StaffBulkInviteResult(
+            email=invite.email,
+            status="error" if error else "invited",
+            error=error
+        )
+        results.append(result)
+        
+        if not error:
+            to_create.append((result, StaffMember(
+                organization_id=current_org_id,
+                store_id=invite.store_id,
+                department_id=invite.department_id,
+                full_name=invite.full_name,
+                email=invite.email,
+                role=invite.role,
+                is_active=True,
+                clerk_id=None  # Será atualizado quando aceitar o convite
+            )))
+    
+    if to_create:
+        try:
+            # Um INSERT em lote para todos os StaffMembers
+            db.add_all([staff for _, staff in to_create])
+            await db.flush()
+            
+            for result, staff in to_create:
+                result.staff_id = staff.id
+                enqueue_invitation(
+                    db,
+                    organization_id=org.clerk_org_id,
+                    email=staff.email,
+                    role=staff.role,
+                    staff_id=staff.id,
+                )
+            
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao registrar convites: {str(e)}"
+            )
+        
+        notify_dispatcher()
+    
+    invited = len(to_create)
+    return StaffBulkInviteResponse(
+        total=len(results),
+        invited=invited,
+        errors=len(results) - invited,
+        results=results
+    )
+
+
 @router.post("/resend/{staff_id}", response_model=dict)
 async def resend_invitation(
     staff_id: int,
@@ -171,17 +297,12 @@ async def resend_invitation(
             detail="Usuário já aceitou o convite"
         )
     
-    # Mapeia role para Clerk role
-    clerk_role = "org:member"
-    if staff.role == StaffRole.ADMIN:
-        clerk_role = "org:admin"
-    
     try:
         # Reenvia convite
         invitation = await clerk_service.create_user_invitation(
             email=staff.email,
             organization_id=org.clerk_org_id,
-            role=clerk_role
+            role=clerk_role_for(staff.role)
         )
         
         return {
@@ -190,6 +311,11 @@ async def resend_invitation(
             "email": staff.email
         }
         
+    except ClerkUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Clerk indisponível, tente novamente em instantes: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,103 @@
+"""Endpoints do usuário atual."""
+import asyncio
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select
+from app.core.database import get_db, AsyncSessionLocal
+from app.core.fast_read import schema_columns
+from app.core.permissions import get_current_staff
+from app.core.responses import model_response
+from app.models.staff_model import StaffMember, StaffRole
+from app.models.organization_model import Organization
+from app.models.store_model import Store
+from app.models.department_model import Department
+from app.routers.v1.staff import build_stats_query, stats_from_row
+from app.schemas.me_schema import MeBootstrap
+from app.schemas.store_schema import StoreResponse
+from app.schemas.department_schema import DepartmentResponse
+
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+STORE_COLUMNS = schema_columns(Store, StoreResponse)
+DEPARTMENT_COLUMNS = schema_columns(Department, DepartmentResponse)
+
+# Mesmos roles das listagens de /stores, /departments e /staff/stats
+CATALOG_ROLES = (StaffRole.ADMIN, StaffRole.MANAGER, StaffRole.STAFF)
+STATS_ROLES = (StaffRole.ADMIN, StaffRole.MANAGER)
+
+
+async def fetch_rows(query: Select) -> list:
+    """Executa uma leitura em sessão própria (conexão própria do pool)."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return result.all()
+
+
+async def no_rows() -> None:
+    return None
+
+
+@router.get("/bootstrap", response_model=MeBootstrap)
+async def get_bootstrap(
+    db: AsyncSession = Depends(get_db),
+    current_staff: StaffMember = Depends(get_current_staff),
+):
+    """
+    Retorna tudo que o app precisa ao abrir: staff atual, organização,
+    lojas, setores e estatísticas, em uma única chamada.
+    
+    O token e o staff são resolvidos uma vez; as leituras independentes rodam
+    em paralelo, cada uma em uma conexão do pool (a organização usa a sessão
+    da própria requisição). Lojas/setores e estatísticas seguem as mesmas
+    permissões de /stores, /departments e /staff/stats e vêm null quando o
+    role não tem acesso.
+    
+    **Permissões**: qualquer membro ativo
+    """
+    clerk_org_id = current_staff.organization_id
+    org_id = (
+        select(Organization.id)
+        .where(Organization.clerk_org_id == clerk_org_id)
+        .scalar_subquery()
+    )
+    
+    can_see_catalog = current_staff.role in CATALOG_ROLES
+    can_see_stats = current_staff.role in STATS_ROLES
+    
+    org_result, stores, departments, stats = await asyncio.gather(
+        db.execute(
+            select(
+                Organization.id,
+                Organization.clerk_org_id,
+                Organization.name,
+                Organization.plan,
+                Organization.access_code,
+            ).where(Organization.clerk_org_id == clerk_org_id)
+        ),
+        fetch_rows(
+            select(*STORE_COLUMNS)
+            .where(Store.organization_id == org_id, Store.is_active == True)
+            .order_by(Store.name)
+        ) if can_see_catalog else no_rows(),
+        fetch_rows(
+            select(*DEPARTMENT_COLUMNS)
+            .where(Department.organization_id == org_id, Department.is_active == True)
+            .order_by(Department.name)
+        ) if can_see_catalog else no_rows(),
+        fetch_rows(build_stats_query(clerk_org_id)) if can_see_stats else no_rows(),
+    )
+    
+    organization = org_result.one_or_none()
+    if organization is not None:
+        organization = organization._asdict()
+        if current_staff.role != StaffRole.ADMIN:
+            organization["access_code"] = None
+    
+    return model_response(MeBootstrap, {
+        "staff": current_staff,
+        "organization": organization,
+        "stores": stores,
+        "departments": departments,
+        "stats": stats_from_row(stats[0]) if stats else None,
+    })
@@ -1,9 +1,14 @@
 """Endpoints para gestão de Staff."""
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select, or_
+from sqlalchemy import Select, func, null, select, or_
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.etag import collection_etag, etag_matches, not_modified, set_etag, table_version
+from app.core.idempotency import IdempotentRoute, idempotency_key
+from app.core.fast_read import FIELDS_QUERY, fetch_json_response, schema_columns, sparse_columns
 from app.core.security import get_current_org_id
 from app.core.permissions import (
     get_current_staff,
@@ -12,21 +17,85 @@ from app.core.permissions import (
     require_staff_or_above
 )
 from app.models.staff_model import StaffMember, StaffRole
+from app.models.store_model import Store
+from app.models.department_model import Department
+from app.models.organization_model import Organization
 from app.schemas.staff_schema import (
     StaffCreate,
     StaffResponse,
     StaffFilter,
-    StaffStats
+    StaffStats,
+    StaffWithDetails,
+    StaffImportResult
 )
+from app.services.staff_import import import_staff, StaffImportError
+from app.services.staff_export import build_export_query, stream_staff_export, MEDIA_TYPES
 
 
-router = APIRouter(prefix="/staff", tags=["staff"])
+router = APIRouter(prefix="/staff", tags=["staff"], route_class=IdempotentRoute)
 
+# Colunas de StaffResponse usadas pela listagem (caminho Core, sem ORM)
+STAFF_LIST_COLUMNS = schema_columns(StaffMember, StaffResponse)
 
-@router.get("", response_model=List[StaffResponse])
+
+def apply_staff_filters(query: Select, filters: StaffFilter, organization_id: str) -> Select:
+    """Aplica o isolamento por organização e os filtros da listagem de staff."""
+    query = query.where(StaffMember.organization_id == organization_id)
+    
+    # Busca textual em nome ou email
+    if filters.q:
+        search_term = f"%{filters.q}%"
+        query = query.where(
+            or_(
+                StaffMember.full_name.ilike(search_term),
+                StaffMember.email.ilike(search_term)
+            )
+        )
+    
+    if filters.role:
+        query = query.where(StaffMember.role == filters.role)
+    
+    # Usam os indexes (organization_id, store_id) e (organization_id, department_id)
+    if filters.store_id is not None:
+        query = query.where(StaffMember.store_id == filters.store_id)
+    
+    if filters.department_id is not None:
+        query = query.where(StaffMember.department_id == filters.department_id)
+    
+    return query
+
+
+def build_stats_query(organization_id: str) -> Select:
+    """Query única com as agregações de StaffStats."""
+    return select(
+        func.count(StaffMember.id).label("total_users"),
+        func.count(StaffMember.id).filter(StaffMember.is_active == True).label("active_users"),
+        func.count(StaffMember.id).filter(StaffMember.role == StaffRole.ADMIN).label("admins"),
+        func.count(StaffMember.id).filter(StaffMember.role == StaffRole.MANAGER).label("managers"),
+    ).where(
+        StaffMember.organization_id == organization_id
+    )
+
+
+def stats_from_row(stats) -> StaffStats:
+    """Converte a linha de build_stats_query em StaffStats."""
+    return StaffStats(
+        total_users=stats.total_users or 0,
+        active_users=stats.active_users or 0,
+        admins=stats.admins or 0,
+        managers=stats.managers or 0,
+    )
+
+
+@router.get("", response_model=List[StaffWithDetails])
 async def list_staff(
+    request: Request,
     q: Optional[str] = Query(None, description="Busca textual em nome/email"),
     role: Optional[StaffRole] = Query(None, description="Filtrar por role"),
+    store_id: Optional[int] = Query(None, description="Filtrar por loja"),
+    department_id: Optional[int] = Query(None, description="Filtrar por setor"),
+    include_details: bool = Query(False, description="Inclui nomes da loja e do setor"),
+    fields: Optional[str] = FIELDS_QUERY,
     db: AsyncSession = Depends(get_db),
     current_org_id: str = Depends(get_current_org_id),
     current_staff: StaffMember = Depends(require_staff_or_above),
@@ -39,29 +108,81 @@ async def list_staff(
     Filtros:
     - q: Busca textual em nome ou email
     - role: Filtra por role específico
+    - store_id: Filtra por loja
+    - department_id: Filtra por setor
+    
+    Com include_details=true, store_name e department_name são preenchidos
+    na mesma query (LEFT JOIN), sem chamadas extras a /stores e /departments.
+    
+    Com fields=id,full_name só essas colunas são lidas e retornadas
+    (ex: componentes de seleção).
+    
+    Responde com ETag; com If-None-Match igual devolve 304 sem corpo.
     """
-    query = select(StaffMember).where(
-        StaffMember.organization_id == current_org_id
-    )
+    filters = StaffFilter(q=q, role=role, store_id=store_id, department_id=department_id)
     
-    # Aplica filtro de busca textual
-    if q:
-        search_term = f"%{q}%"
-        query = query.where(
-            or_(
-                StaffMember.full_name.ilike(search_term),
-                StaffMember.email.ilike(search_term)
-            )
+    if include_details:
+        detail_columns = [Store.name.label("store_name"), Department.name.label("department_name")]
+    else:
+        detail_columns = [null().label("store_name"), null().label("department_name")]
+    columns = sparse_columns([*STAFF_LIST_COLUMNS, *detail_columns], fields)
+    selected = {column.key for column in columns}
+    
+    # GET condicional: 304 sem ler nem serializar as linhas
+    versions = [table_version(StaffMember, StaffMember.organization_id == current_org_id)]
+    if include_details and selected & {"store_name", "department_name"}:
+        # Renomear loja/setor também muda a resposta
+        org_id = (
+            select(Organization.id)
+            .where(Organization.clerk_org_id == current_org_id)
+            .scalar_subquery()
         )
+        versions.append(table_version(Store, Store.organization_id == org_id))
+        versions.append(table_version(Department, Department.organization_id == org_id))
+    etag = await collection_etag(db, request, current_org_id, *versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Leitura somente de colunas (sem hidratar StaffMember), direto para JSON;
+    # os JOINs só entram se os nomes de loja/setor foram pedidos
+    query = select(*columns).select_from(StaffMember)
+    if include_details and "store_name" in selected:
+        query = query.outerjoin(Store, StaffMember.store_id == Store.id)
+    if include_details and "department_name" in selected:
+        query = query.outerjoin(Department, StaffMember.department_id == Department.id)
+    
+    query = apply_staff_filters(query, filters, current_org_id)
+    
+    response = await fetch_json_response(db, query)
+    return set_etag(response, etag)
+
+
+@router.get("/export")
+async def export_staff(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Formato do arquivo: csv ou ndjson"),
+    q: Optional[str] = Query(None, description="Busca textual em nome/email"),
+    role: Optional[StaffRole] = Query(None, description="Filtrar por role"),
+    store_id: Optional[int] = Query(None, description="Filtrar por loja"),
+    department_id: Optional[int] = Query(None, description="Filtrar por setor"),
+    current_org_id: str = Depends(get_current_org_id),
+    current_staff: StaffMember = Depends(require_manager_or_admin),
+):
+    """
+    Exporta a equipe da organização atual em CSV ou NDJSON (streaming).
     
-    # Aplica filtro de role
-    if role:
-        query = query.where(StaffMember.role == role)
+    **Permissões**: MANAGER ou ADMIN
     
-    result = await db.execute(query)
-    staff_members = result.scalars().all()
+    Aceita os mesmos filtros de GET /staff. As linhas saem de um cursor no
+    servidor direto para a resposta, sem carregar a lista inteira em memória.
+    """
+    filters = StaffFilter(q=q, role=role, store_id=store_id, department_id=department_id)
+    query = apply_staff_filters(build_export_query(), filters, current_org_id)
     
-    return staff_members
+    return StreamingResponse(
+        stream_staff_export(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="staff.{format}"'},
+    )
 
 
 @router.get("/stats", response_model=StaffStats)
@@ -75,28 +196,11 @@ async def get_staff_stats(
     
     **Permissões**: MANAGER ou ADMIN
     """
-    # Query única com agregações
-    query = select(
-        func.count(StaffMember.id).label("total_users"),
-        func.count(StaffMember.id).filter(StaffMember.is_active == True).label("active_users"),
-        func.count(StaffMember.id).filter(StaffMember.role == StaffRole.ADMIN).label("admins"),
-        func.count(StaffMember.id).filter(StaffMember.role == StaffRole.MANAGER).label("managers"),
-    ).where(
-        StaffMember.organization_id == current_org_id
-    )
-    
-    result = await db.execute(query)
-    stats = result.first()
-    
-    return StaffStats(
-        total_users=stats.total_users or 0,
-        active_users=stats.active_users or 0,
-        admins=stats.admins or 0,
-        managers=stats.managers or 0,
-    )
+    result = await db.execute(build_stats_query(current_org_id))
+    return stats_from_row(result.first())
 
 
-@router.post("", response_model=StaffResponse, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=StaffResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(idempotency_key)])
 async def create_staff(
     staff_data: StaffCreate,
     db: AsyncSession = Depends(get_db),
@@ -136,3 +240,41 @@ async def create_staff(
     
     return new_staff
 
+
+
+@router.post("/import", response_model=StaffImportResult)
+async def import_staff_bulk(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Formato do arquivo: csv ou ndjson"),
+    db: AsyncSession = Depends(get_db),
+    current_org_id: str = Depends(get_current_org_id),
+    current_staff: StaffMember = Depends(require_admin),
+):
+    """
+    Importa membros da equipe em massa (CSV ou NDJSON no corpo da requisição).
+    
+    **Permissões**: ADMIN apenas
+    
+    Colunas/campos: full_name, email, role, store_id, department_id, is_active.
+    O arquivo é lido em streaming e enviado ao banco via COPY; emails que já
+    existem na organização são ignorados (idx_staff_org_email). O retorno traz
+    o resultado de cada linha: created, skipped ou error.
+    """
+    try:
+        result = await import_staff(
+            db,
+            organization_id=current_org_id,
+            chunks=request.stream(),
+            file_format=format,
+            max_rows=settings.STAFF_IMPORT_MAX_ROWS,
+        )
+    except StaffImportError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    await db.commit()
+    
+    return result
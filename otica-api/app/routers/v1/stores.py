@@ -1,19 +1,25 @@
 """Endpoints para gestão de Stores (Lojas)."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
+from app.core.etag import collection_etag, etag_matches, not_modified, set_etag, table_version
+from app.core.fast_read import FIELDS_QUERY, fetch_json_response, schema_columns, sparse_columns
 from app.core.security import get_current_org_id
 from app.core.permissions import require_admin, require_staff_or_above
 from app.models.store_model import Store
 from app.models.organization_model import Organization
 from app.models.staff_model import StaffMember
 from app.schemas.store_schema import StoreCreate, StoreUpdate, StoreResponse
+from app.services.public_org_cache import public_org_cache
 
 
 router = APIRouter(prefix="/stores", tags=["stores"])
 
+# Colunas de StoreResponse usadas pela listagem (caminho Core, sem ORM)
+LIST_COLUMNS = schema_columns(Store, StoreResponse)
+
 
 async def get_org_internal_id(
     db: AsyncSession,
@@ -34,6 +40,8 @@ async def get_org_internal_id(
 
 @router.get("", response_model=List[StoreResponse])
 async def list_stores(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
     db: AsyncSession = Depends(get_db),
     current_org_id: str = Depends(get_current_org_id),
     current_staff: StaffMember = Depends(require_staff_or_above),
@@ -42,18 +50,30 @@ async def list_stores(
     Lista todas as lojas da organização atual.
     
     **Permissões**: STAFF, MANAGER ou ADMIN
+    
+    Responde com ETag; com If-None-Match igual devolve 304 sem corpo.
+    Com fields=id,name só essas colunas são lidas e retornadas.
     """
+    columns = sparse_columns(LIST_COLUMNS, fields)
     org_id = await get_org_internal_id(db, current_org_id)
     
-    result = await db.execute(
-        select(Store).where(
+    # GET condicional: 304 sem ler nem serializar as linhas
+    etag = await collection_etag(
+        db, request, current_org_id,
+        table_version(Store, Store.organization_id == org_id),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Leitura somente de colunas (sem hidratar entidades), direto para JSON
+    response = await fetch_json_response(
+        db,
+        select(*columns).where(
             Store.organization_id == org_id,
             Store.is_active == True
-        )
+        ).order_by(Store.name)
     )
-    stores = result.scalars().all()
-    
-    return stores
+    return set_etag(response, etag)
 
 
 @router.get("/{store_id}", response_model=StoreResponse)
@@ -121,6 +141,7 @@ async def create_store(
     
     db.add(new_store)
     await db.commit()
+    public_org_cache.invalidate_org(org_id)
     await db.refresh(new_store)
     
     return new_store
@@ -161,6 +182,7 @@ async def update_store(
         setattr(store, field, value)
     
     await db.commit()
+    public_org_cache.invalidate_org(org_id)
     await db.refresh(store)
     
     return store
@@ -196,4 +218,5 @@ async def delete_store(
     
     store.is_active = False
     await db.commit()
+    public_org_cache.invalidate_org(org_id)
 
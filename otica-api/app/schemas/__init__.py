@@ -5,7 +5,10 @@ from app.schemas.staff_schema import (
     StaffCreate,
     StaffResponse,
     StaffFilter,
-    StaffStats
+    StaffStats,
+    StaffWithDetails,
+    StaffImportRowResult,
+    StaffImportResult
 )
 from app.schemas.organization_schema import (
     OrganizationCreate,
@@ -23,6 +26,16 @@ from app.schemas.department_schema import (
     DepartmentUpdate,
     DepartmentResponse
 )
+from app.schemas.me_schema import (
+    MeOrganization,
+    MeBootstrap
+)
+from app.schemas.batch_schema import (
+    BatchSubRequest,
+    BatchRequest,
+    BatchSubResponse,
+    BatchResponse
+)
 from app.schemas.access_request_schema import (
     AccessRequestCreate,
     AccessRequestApprove,
@@ -37,6 +50,9 @@ __all__ = [
     "StaffResponse",
     "StaffFilter",
     "StaffStats",
+    "StaffWithDetails",
+    "StaffImportRowResult",
+    "StaffImportResult",
     # Organization
     "OrganizationCreate",
     "OrganizationUpdate",
@@ -50,6 +66,14 @@ __all__ = [
     "DepartmentCreate",
     "DepartmentUpdate",
     "DepartmentResponse",
+    # Me
+    "MeOrganization",
+    "MeBootstrap",
+    # Batch
+    "BatchSubRequest",
+    "BatchRequest",
+    "BatchSubResponse",
+    "BatchResponse",
     # AccessRequest
     "AccessRequestCreate",
     "AccessRequestApprove",
@@ -0,0 +1,30 @@
+"""Schemas Pydantic para /batch."""
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+
+
+class BatchSubRequest(BaseModel):
+    """Uma chamada a um endpoint da API v1 dentro do batch."""
+    id: Optional[str] = Field(None, max_length=100, description="Identificador livre, devolvido na resposta")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(..., description="Path com query string, ex: /api/v1/staff?role=ADMIN")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Ex: If-None-Match, Idempotency-Key")
+    body: Optional[Any] = Field(None, description="Corpo JSON")
+
+
+class BatchRequest(BaseModel):
+    """Lista de sub-requisições executadas com o mesmo contexto de autenticação."""
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    """Resultado de uma sub-requisição."""
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Resultados na mesma ordem das sub-requisições."""
+    responses: List[BatchSubResponse]
@@ -0,0 +1,24 @@
+"""Schemas Pydantic para o usuário atual (/me)."""
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.schemas.staff_schema import StaffResponse, StaffStats
+from app.schemas.store_schema import StoreResponse
+from app.schemas.department_schema import DepartmentResponse
+
+
+class MeOrganization(BaseModel):
+    """Dados da organização do usuário atual."""
+    id: int
+    clerk_org_id: str
+    name: str
+    plan: str
+    access_code: Optional[str] = Field(None, description="Preenchido apenas para ADMIN")
+
+
+class MeBootstrap(BaseModel):
+    """Tudo que o app precisa ao abrir a sessão, em uma única resposta."""
+    staff: StaffResponse
+    organization: Optional[MeOrganization] = None
+    stores: Optional[List[StoreResponse]] = Field(None, description="Lojas ativas (STAFF ou acima)")
+    departments: Optional[List[DepartmentResponse]] = Field(None, description="Setores ativos (STAFF ou acima)")
+    stats: Optional[StaffStats] = Field(None, description="Preenchido apenas para MANAGER e ADMIN")
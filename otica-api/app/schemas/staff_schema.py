@@ -1,6 +1,6 @@
 """Schemas Pydantic para Staff."""
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.models.staff_model import StaffRole
 
@@ -64,3 +64,42 @@ class StaffStats(BaseModel):
     admins: int
     managers: int
 
+
+
+class StaffImportRowResult(BaseModel):
+    """Resultado de uma linha da importação em massa."""
+    row: int = Field(..., description="Número da linha de dados (sem contar o cabeçalho)")
+    email: Optional[str] = None
+    status: Literal["created", "skipped", "error"]
+    staff_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class StaffImportResult(BaseModel):
+    """Relatório da importação em massa de Staff."""
+    total: int
+    created: int
+    skipped: int
+    errors: int
+    rows: List[StaffImportRowResult]
+
+
+class StaffBulkInvite(BaseModel):
+    """Schema para convidar vários usuários de uma vez."""
+    invitations: List[StaffInvite] = Field(..., min_length=1)
+
+
+class StaffBulkInviteResult(BaseModel):
+    """Resultado do convite de um email no lote."""
+    email: str
+    status: Literal["invited", "error"]
+    staff_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class StaffBulkInviteResponse(BaseModel):
+    """Resposta do convite em lote."""
+    total: int
+    invited: int
+    errors: int
+    results: List[StaffBulkInviteResult]
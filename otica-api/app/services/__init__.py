@@ -1,5 +1,5 @@
 # Services
-from app.services.clerk_service import ClerkService
+from app.services.clerk_service import ClerkService, ClerkUnavailableError
 
-__all__ = ["ClerkService"]
+__all__ = ["ClerkService", "ClerkUnavailableError"]
 
@@ -1,13 +1,360 @@
 """Serviço de integração com a API do Clerk."""
+import asyncio
+import logging
+import random
+import time
 import httpx
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional
 from app.core.config import settings
+from app.core.metrics import observe_clerk_request
+from app.core.http_client import get_http_client
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# RESILIÊNCIA (retry, backoff, circuit breaker)
+# ============================================
+
+class ClerkUnavailableError(Exception):
+    """Clerk indisponível: circuit breaker aberto ou falha após as tentativas."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples (closed → open → half_open).
+    
+    Depois de `failure_threshold` falhas seguidas o circuito abre e as chamadas
+    falham na hora, sem ir à rede, por `reset_timeout` segundos. Em seguida
+    uma única chamada de teste (half_open) decide se fecha ou reabre.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opened_total = 0
+        self.rejected_total = 0
+        self._probe_in_flight = False
+    
+    def allow_request(self) -> bool:
+        """Indica se a chamada pode seguir para a rede."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected_total += 1
+                return False
+            self.state = self.HALF_OPEN
+        
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected_total += 1
+                return False
+            self._probe_in_flight = True
+        
+        return True
+    
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("circuit breaker %s fechado", self.name)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened_total += 1
+                logger.warning(
+                    "circuit breaker %s aberto após %s falhas",
+                    self.name,
+                    self.consecutive_failures,
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+    
+    def release(self) -> None:
+        """Encerra uma chamada sem contar sucesso nem falha (ex: só recebeu 429)."""
+        self._probe_in_flight = False
+    
+    def snapshot(self) -> dict:
+        """Estado atual para métricas."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_total": self.opened_total,
+            "rejected_total": self.rejected_total,
+        }
+
+
+# Um breaker para a Backend API e outro para o JWKS (host do CLERK_ISSUER)
+api_breaker = CircuitBreaker(
+    "clerk_api",
+    failure_threshold=settings.CLERK_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.CLERK_BREAKER_RESET_TIMEOUT,
+)
+jwks_breaker = CircuitBreaker(
+    "clerk_jwks",
+    failure_threshold=settings.CLERK_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.CLERK_BREAKER_RESET_TIMEOUT,
+)
+
+
+def get_breaker_metrics() -> dict:
+    """Estado dos circuit breakers do Clerk."""
+    return {breaker.name: breaker.snapshot() for breaker in (api_breaker, jwks_breaker)}
+
+
+class TokenBucket:
+    """
+    Rate limiter assíncrono (token bucket) compartilhado pelas chamadas ao Clerk.
+    
+    Chamadas acima do limite esperam na fila (FIFO) em vez de estourar o rate
+    limit do Clerk; um 429 com Retry-After pausa o bucket inteiro.
+    O limite é por worker: com N workers o total é N x rate.
+    """
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        # Métricas
+        self.queue_depth = 0
+        self.acquired_total = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled_total = 0
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    async def acquire(self) -> None:
+        """Espera até haver um token disponível (e o bucket não estar pausado)."""
+        started = time.monotonic()
+        self.queue_depth += 1
+        try:
+            # asyncio.Lock é FIFO: quem chegou primeiro sai primeiro
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.paused_until:
+                        await asyncio.sleep(self.paused_until - now)
+                        continue
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.queue_depth -= 1
+        
+        waited = time.monotonic() - started
+        self.acquired_total += 1
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+    
+    def pause(self, seconds: float) -> None:
+        """Suspende novas chamadas por `seconds` (Retry-After do Clerk)."""
+        self.throttled_total += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+    
+    def snapshot(self) -> dict:
+        """Estado atual para métricas."""
+        return {
+            "queue_depth": self.queue_depth,
+            "acquired_total": self.acquired_total,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "throttled_total": self.throttled_total,
+        }
+
+
+# Só a Backend API tem rate limit por instância; o JWKS não passa pelo bucket
+api_rate_limiter = TokenBucket(
+    rate=settings.CLERK_RATE_LIMIT_PER_SECOND,
+    capacity=settings.CLERK_RATE_LIMIT_BURST,
+)
+
+
+def get_rate_limiter_metrics() -> dict:
+    """Estado do rate limiter da Backend API do Clerk."""
+    return api_rate_limiter.snapshot()
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Converte o header Retry-After (segundos ou data HTTP) em segundos."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), settings.CLERK_RETRY_AFTER_MAX)
+
+
+# Timeout de leitura (segundos) por operação
+OPERATION_TIMEOUTS = {
+    "get_jwks": 3.0,
+    "get_user": 5.0,
+    "get_user_by_email": 5.0,
+    "create_invitation": 10.0,
+    "create_user": 10.0,
+    "add_membership": 10.0,
+    "delete_user": 10.0,
+}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Backoff exponencial com full jitter."""
+    cap = min(settings.CLERK_RETRY_MAX_DELAY, settings.CLERK_RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+async def clerk_request(
+    method: str,
+    url: str,
+    *,
+    operation: str,
+    idempotent: bool,
+    breaker: CircuitBreaker = api_breaker,
+    limiter: TokenBucket | None = api_rate_limiter,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Faz uma chamada ao Clerk com timeout por operação, rate limit, retry e
+    circuit breaker.
+    
+    - Cada tentativa passa antes pelo `limiter` (token bucket), se houver
+    - Chamadas idempotentes são repetidas em erro de rede, timeout, 429 e 5xx
+    - Não idempotentes (POST) só são repetidas quando o Clerk não chegou a
+      processar (conexão não aberta ou 429), para não duplicar convites
+    - 429 respeita o Retry-After, não conta como falha para o breaker e
+      tem orçamento próprio (CLERK_THROTTLE_RETRIES): só a tentativa
+      recusada por 429 é repetida; erro posterior segue a regra acima
+    - Respostas 4xx (exceto 429) são devolvidas ao chamador normalmente
+    
+    Raises:
+        ClerkUnavailableError: breaker aberto ou falha após todas as tentativas
+    """
+    if not breaker.allow_request():
+        observe_clerk_request(operation, "circuit_open")
+        raise ClerkUnavailableError(f"Clerk indisponível ({breaker.name}): circuit breaker aberto")
+    
+    client = get_http_client()
+    timeout = httpx.Timeout(
+        OPERATION_TIMEOUTS.get(operation, settings.CLERK_HTTP_READ_TIMEOUT),
+        connect=settings.CLERK_HTTP_CONNECT_TIMEOUT,
+    )
+    last_error = None
+    only_throttled = True
+    
+    attempt = 0
+    failures = 0  # Tentativas com erro (exceto 429)
+    throttles = 0  # Tentativas recusadas com 429
+    try:
+        while True:
+            if limiter is not None:
+                await limiter.acquire()
+            
+            retry_after = None
+            # Decisão por tentativa: POST só repete se esta tentativa não
+            # chegou a ser processada pelo Clerk
+            can_retry = idempotent
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, timeout=timeout, **kwargs)
+                observe_clerk_request(
+                    operation,
+                    "429" if response.status_code == 429 else f"{response.status_code // 100}xx",
+                    time.perf_counter() - started,
+                )
+                if response.status_code not in RETRYABLE_STATUS:
+                    breaker.record_success()
+                    return response
+                last_error = f"HTTP {response.status_code}"
+                if response.status_code == 429:
+                    # Recusado pelo rate limit, sem processar: seguro repetir mesmo em POST
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    if limiter is not None:
+                        limiter.pause(retry_after if retry_after is not None else _backoff_delay(throttles + 1))
+                    throttles += 1
+                    can_retry = throttles <= settings.CLERK_THROTTLE_RETRIES
+                else:
+                    failures += 1
+                    only_throttled = False
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Requisição não chegou ao Clerk: seguro repetir mesmo em POST
+                observe_clerk_request(operation, "network_error", time.perf_counter() - started)
+                last_error = repr(e)
+                failures += 1
+                only_throttled = False
+                can_retry = True
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                outcome = "timeout" if isinstance(e, httpx.TimeoutException) else "network_error"
+                observe_clerk_request(operation, outcome, time.perf_counter() - started)
+                last_error = repr(e)
+                failures += 1
+                only_throttled = False
+            
+            attempt += 1
+            if not can_retry or failures >= settings.CLERK_RETRY_ATTEMPTS:
+                break
+            
+            if retry_after is not None and limiter is None:
+                await asyncio.sleep(retry_after)
+            elif retry_after is None:
+                await asyncio.sleep(_backoff_delay(attempt))
+            # Com limiter, a espera do Retry-After acontece no próprio acquire()
+    except asyncio.CancelledError:
+        # Cancelado (ex: cliente desconectou): libera a sonda do half_open
+        breaker.release()
+        raise
+    except BaseException:
+        # Erro não previsto (DecodingError, TooManyRedirects...): conta como
+        # falha, senão o breaker ficaria preso em half_open
+        breaker.record_failure()
+        raise
+    
+    if only_throttled:
+        breaker.release()
+    else:
+        breaker.record_failure()
+    logger.warning(
+        "Clerk %s falhou após %s tentativa(s): %s",
+        operation,
+        attempt,
+        last_error,
+        extra={"clerk_operation": operation, "attempts": attempt},
+    )
+    raise ClerkUnavailableError(f"Clerk indisponível ({operation}): {last_error}")
 
 
 class ClerkService:
     """Serviço para operações com a API do Clerk."""
     
-    BASE_URL = "https://api.clerk.com/v1"
+    BASE_URL = settings.CLERK_API_URL.rstrip("/")
     
     def __init__(self):
         if not settings.CLERK_SECRET_KEY:
@@ -38,25 +385,27 @@ class ClerkService:
         Returns:
             dict com dados do convite criado
         """
-        async with httpx.AsyncClient() as client:
-            # Cria o convite para a organização
-            payload = {
-                "email_address": email,
-                "role": role,
-                "redirect_url": redirect_url or f"{settings.CORS_ORIGINS.split(',')[0]}/sign-in"
-            }
-            
-            response = await client.post(
-                f"{self.BASE_URL}/organizations/{organization_id}/invitations",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code not in [200, 201]:
-                error_detail = response.json() if response.text else "Unknown error"
-                raise Exception(f"Erro ao criar convite no Clerk: {error_detail}")
-            
-            return response.json()
+        # Cria o convite para a organização
+        payload = {
+            "email_address": email,
+            "role": role,
+            "redirect_url": redirect_url or f"{settings.CORS_ORIGINS.split(',')[0]}/sign-in"
+        }
+        
+        response = await clerk_request(
+            "POST",
+            f"{self.BASE_URL}/organizations/{organization_id}/invitations",
+            operation="create_invitation",
+            idempotent=False,
+            headers=self.headers,
+            json=payload
+        )
+        
+        if response.status_code not in [200, 201]:
+            error_detail = response.json() if response.text else "Unknown error"
+            raise Exception(f"Erro ao criar convite no Clerk: {error_detail}")
+        
+        return response.json()
     
     async def create_user(
         self,
@@ -77,25 +426,27 @@ class ClerkService:
         Returns:
             dict com dados do usuário criado
         """
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "email_address": [email],
-                "first_name": first_name,
-                "last_name": last_name,
-                "skip_password_requirement": skip_password_requirement
-            }
-            
-            response = await client.post(
-                f"{self.BASE_URL}/users",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code not in [200, 201]:
-                error_detail = response.json() if response.text else "Unknown error"
-                raise Exception(f"Erro ao criar usuário no Clerk: {error_detail}")
-            
-            return response.json()
+        payload = {
+            "email_address": [email],
+            "first_name": first_name,
+            "last_name": last_name,
+            "skip_password_requirement": skip_password_requirement
+        }
+        
+        response = await clerk_request(
+            "POST",
+            f"{self.BASE_URL}/users",
+            operation="create_user",
+            idempotent=False,
+            headers=self.headers,
+            json=payload
+        )
+        
+        if response.status_code not in [200, 201]:
+            error_detail = response.json() if response.text else "Unknown error"
+            raise Exception(f"Erro ao criar usuário no Clerk: {error_detail}")
+        
+        return response.json()
     
     async def add_user_to_organization(
         self,
@@ -114,23 +465,25 @@ class ClerkService:
         Returns:
             dict com dados da membership
         """
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "user_id": user_id,
-                "role": role
-            }
-            
-            response = await client.post(
-                f"{self.BASE_URL}/organizations/{organization_id}/memberships",
-                headers=self.headers,
-                json=payload
-            )
-            
-            if response.status_code not in [200, 201]:
-                error_detail = response.json() if response.text else "Unknown error"
-                raise Exception(f"Erro ao adicionar usuário à organização: {error_detail}")
-            
-            return response.json()
+        payload = {
+            "user_id": user_id,
+            "role": role
+        }
+        
+        response = await clerk_request(
+            "POST",
+            f"{self.BASE_URL}/organizations/{organization_id}/memberships",
+            operation="add_membership",
+            idempotent=False,
+            headers=self.headers,
+            json=payload
+        )
+        
+        if response.status_code not in [200, 201]:
+            error_detail = response.json() if response.text else "Unknown error"
+            raise Exception(f"Erro ao adicionar usuário à organização: {error_detail}")
+        
+        return response.json()
     
     async def get_user_by_email(self, email: str) -> Optional[dict]:
         """
@@ -142,21 +495,23 @@ class ClerkService:
         Returns:
             dict com dados do usuário ou None se não encontrado
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/users",
-                headers=self.headers,
-                params={"email_address": email}
-            )
-            
-            if response.status_code != 200:
-                return None
-            
-            users = response.json()
-            if users and len(users) > 0:
-                return users[0]
-            
+        response = await clerk_request(
+            "GET",
+            f"{self.BASE_URL}/users",
+            operation="get_user_by_email",
+            idempotent=True,
+            headers=self.headers,
+            params={"email_address": email}
+        )
+        
+        if response.status_code != 200:
             return None
+        
+        users = response.json()
+        if users and len(users) > 0:
+            return users[0]
+        
+        return None
     
     async def delete_user(self, user_id: str) -> bool:
         """
@@ -168,13 +523,15 @@ class ClerkService:
         Returns:
             True se deletado com sucesso
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.BASE_URL}/users/{user_id}",
-                headers=self.headers
-            )
-            
-            return response.status_code in [200, 204]
+        response = await clerk_request(
+            "DELETE",
+            f"{self.BASE_URL}/users/{user_id}",
+            operation="delete_user",
+            idempotent=True,
+            headers=self.headers
+        )
+        
+        return response.status_code in [200, 204]
 
 
 # Singleton lazy para uso global
@@ -0,0 +1,250 @@
+"""Outbox de convites do Clerk: enfileiramento transacional e dispatcher."""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.tracing import span
+from app.models.invitation_outbox_model import InvitationOutbox, InvitationOutboxStatus
+from app.models.staff_model import StaffRole
+from app.services.clerk_service import ClerkService, get_clerk_service
+
+
+logger = logging.getLogger(__name__)
+
+# Acorda o dispatcher logo após um commit, sem esperar o próximo polling
+_wake_event = asyncio.Event()
+
+
+def clerk_role_for(role: StaffRole) -> str:
+    """Mapeia o role do staff para o role da organização no Clerk."""
+    return "org:admin" if role == StaffRole.ADMIN else "org:member"
+
+
+def enqueue_invitation(
+    db: AsyncSession,
+    *,
+    organization_id: str,
+    email: str,
+    role: StaffRole,
+    staff_id: int | None = None,
+) -> InvitationOutbox:
+    """
+    Adiciona um convite ao outbox na transação atual (não faz commit).
+
+    Depois do commit, chame notify_dispatcher() para o envio imediato.
+    """
+    entry = InvitationOutbox(
+        organization_id=organization_id,
+        staff_id=staff_id,
+        email=email,
+        clerk_role=clerk_role_for(role),
+        status=InvitationOutboxStatus.PENDING,
+        attempts=0,
+    )
+    db.add(entry)
+    return entry
+
+
+def notify_dispatcher() -> None:
+    """Sinaliza que há convites novos no outbox."""
+    _wake_event.set()
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = min(
+        settings.INVITATION_OUTBOX_MAX_BACKOFF,
+        settings.INVITATION_OUTBOX_BASE_BACKOFF * (2 ** (attempts - 1)),
+    )
+    return timedelta(seconds=seconds)
+
+
+async def claim_batch(session: AsyncSession, limit: int) -> list:
+    """
+    Reserva até `limit` convites vencidos para este worker.
+
+    FOR UPDATE SKIP LOCKED deixa vários workers/processos dividirem a fila
+    sem bloqueio. A reserva é um lease: next_attempt_at vai para o futuro e,
+    se o worker cair, a linha volta a ficar disponível quando ele expirar.
+    """
+    due = (
+        select(InvitationOutbox.id)
+        .where(
+            InvitationOutbox.status.in_([
+                InvitationOutboxStatus.PENDING,
+                InvitationOutboxStatus.PROCESSING,
+            ]),
+            InvitationOutbox.next_attempt_at <= func.now(),
+        )
+        .order_by(InvitationOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(
+        update(InvitationOutbox)
+        .where(InvitationOutbox.id.in_(due.scalar_subquery()))
+        .values(
+            status=InvitationOutboxStatus.PROCESSING,
+            attempts=InvitationOutbox.attempts + 1,
+            next_attempt_at=func.now() + timedelta(seconds=settings.INVITATION_OUTBOX_LEASE_SECONDS),
+        )
+        .returning(
+            InvitationOutbox.id,
+            InvitationOutbox.organization_id,
+            InvitationOutbox.email,
+            InvitationOutbox.clerk_role,
+            InvitationOutbox.attempts,
+        )
+    )
+    claimed = result.all()
+    await session.commit()
+    return claimed
+
+
+def _owned(entry):
+    """
+    Filtro da linha enquanto ela ainda pertence a esta reserva.
+
+    `attempts` é incrementado a cada claim e funciona como token: se o lease
+    expirou e outro dispatcher reservou a linha, o filtro não casa mais.
+    """
+    return (
+        InvitationOutbox.id == entry.id,
+        InvitationOutbox.attempts == entry.attempts,
+        InvitationOutbox.status == InvitationOutboxStatus.PROCESSING,
+    )
+
+
+async def _renew_lease(entry) -> bool:
+    """Renova o lease antes do envio; False se a reserva foi perdida."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(InvitationOutbox)
+            .where(*_owned(entry))
+            .values(next_attempt_at=func.now() + timedelta(seconds=settings.INVITATION_OUTBOX_LEASE_SECONDS))
+        )
+        await session.commit()
+    return result.rowcount == 1
+
+
+async def _save_result(entry, values: dict) -> None:
+    """Grava o resultado de um envio logo após ele terminar (transação curta)."""
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(InvitationOutbox).where(*_owned(entry)).values(**values))
+        await session.commit()
+
+
+async def _send(clerk_service: ClerkService, entry, semaphore: asyncio.Semaphore) -> None:
+    """
+    Envia um convite reservado e grava o resultado no outbox.
+
+    O lease é renovado ao começar o envio (a espera pelo semáforo pode
+    passar do lease do claim) e o resultado é gravado na hora: queda do
+    worker no meio do lote não perde os convites já enviados.
+    """
+    async with semaphore:
+        if not await _renew_lease(entry):
+            logger.warning(
+                "convite %s reservado por outro dispatcher; envio ignorado",
+                entry.id,
+                extra={"outbox_id": entry.id, "org_id": entry.organization_id},
+            )
+            return
+
+        try:
+            with span("invitation_outbox.send", {"tenant.org_id": entry.organization_id, "outbox.id": entry.id}):
+                invitation = await clerk_service.create_user_invitation(
+                    email=entry.email,
+                    organization_id=entry.organization_id,
+                    role=entry.clerk_role,
+                )
+        except Exception as e:
+            if entry.attempts >= settings.INVITATION_OUTBOX_MAX_ATTEMPTS:
+                values = {"status": InvitationOutboxStatus.FAILED}
+                logger.error(
+                    "convite %s falhou definitivamente após %s tentativas: %s",
+                    entry.id, entry.attempts, e,
+                    extra={"outbox_id": entry.id, "org_id": entry.organization_id},
+                )
+            else:
+                values = {
+                    "status": InvitationOutboxStatus.PENDING,
+                    "next_attempt_at": datetime.now(timezone.utc) + _retry_delay(entry.attempts),
+                }
+            values["last_error"] = str(e)[:1000]
+        else:
+            values = {
+                "status": InvitationOutboxStatus.SENT,
+                "invitation_id": invitation.get("id"),
+                "sent_at": datetime.now(timezone.utc),
+                "last_error": None,
+            }
+
+        await _save_result(entry, values)
+
+
+async def dispatch_once(clerk_service: ClerkService, limit: int | None = None) -> int:
+    """
+    Processa um lote do outbox. Retorna quantos convites foram reservados.
+
+    Os envios do lote rodam em paralelo, limitados por
+    INVITATION_OUTBOX_CONCURRENCY chamadas simultâneas ao Clerk; cada um
+    renova seu lease e grava o próprio resultado.
+    """
+    async with AsyncSessionLocal() as session:
+        claimed = await claim_batch(session, limit or settings.INVITATION_OUTBOX_BATCH_SIZE)
+    if not claimed:
+        return 0
+
+    semaphore = asyncio.Semaphore(settings.INVITATION_OUTBOX_CONCURRENCY)
+    with span("invitation_outbox.dispatch", {"outbox.batch_size": len(claimed)}):
+        results = await asyncio.gather(
+            *(_send(clerk_service, entry, semaphore) for entry in claimed),
+            return_exceptions=True,
+        )
+
+    for entry, result in zip(claimed, results):
+        if isinstance(result, Exception):
+            # Falha ao gravar: a linha volta para a fila quando o lease expirar
+            logger.error(
+                "erro ao processar o convite %s do outbox: %s",
+                entry.id, result,
+                extra={"outbox_id": entry.id, "org_id": entry.organization_id},
+            )
+
+    return len(claimed)
+
+
+async def run_dispatcher() -> None:
+    """
+    Loop do dispatcher (task iniciada no lifespan da aplicação).
+
+    Processa lotes enquanto houver convites vencidos; quando a fila esvazia,
+    espera notify_dispatcher() ou o intervalo de polling.
+    """
+    clerk_service = get_clerk_service()
+    logger.info("dispatcher do outbox de convites iniciado")
+
+    while True:
+        # Limpa antes de processar: notificações durante o lote não se perdem
+        _wake_event.clear()
+        try:
+            processed = await dispatch_once(clerk_service)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("erro no dispatcher do outbox de convites")
+            processed = 0
+
+        if processed:
+            continue
+
+        try:
+            await asyncio.wait_for(
+                _wake_event.wait(),
+                timeout=settings.INVITATION_OUTBOX_POLL_INTERVAL,
+            )
+        except asyncio.TimeoutError:
+            pass
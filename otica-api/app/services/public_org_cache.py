@@ -0,0 +1,125 @@
+"""Cache por worker das informações públicas da organização (validate-code)."""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from app.core.config import settings
+
+
+@dataclass
+class PublicOrgEntry:
+    """Resposta já serializada para um código; body None = código inexistente."""
+    org_id: Optional[int]
+    body: Optional[bytes]
+    expires_at: float
+
+
+class PublicOrgCache:
+    """
+    LRU com TTL para GET /access-requests/public/validate-code.
+
+    - Códigos válidos ficam `ttl` segundos; inválidos (cache negativo) ficam
+      `negative_ttl`, para spam de um mesmo código não chegar ao banco
+    - Limite de entradas: códigos aleatórios (força bruta) não crescem a
+      memória sem limite, só empurram as entradas antigas para fora
+    - Misses simultâneos do mesmo código fazem uma única carga (single-flight)
+
+    O cache é por worker: invalidate_org() limpa o worker local e o TTL limita
+    quanto tempo os outros workers servem dados antigos.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, PublicOrgEntry] = OrderedDict()
+        self._loading: dict[str, asyncio.Future] = {}
+        # Métricas
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get(self, code: str) -> Optional[PublicOrgEntry]:
+        """Entrada válida do cache, ou None."""
+        entry = self._entries.get(code)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[code]
+            return None
+        self._entries.move_to_end(code)
+        return entry
+
+    def put(self, code: str, org_id: Optional[int], body: Optional[bytes]) -> PublicOrgEntry:
+        """Grava a entrada, removendo as menos usadas acima do limite."""
+        ttl = self.ttl if body is not None else self.negative_ttl
+        entry = PublicOrgEntry(org_id=org_id, body=body, expires_at=time.monotonic() + ttl)
+        self._entries[code] = entry
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    async def get_or_load(
+        self,
+        code: str,
+        loader: Callable[[], Awaitable[tuple[Optional[int], Optional[bytes]]]],
+    ) -> PublicOrgEntry:
+        """Devolve a entrada do cache ou carrega com `loader` (uma carga por código)."""
+        entry = self.get(code)
+        if entry is not None:
+            if entry.body is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return entry
+
+        pending = self._loading.get(code)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[code] = future
+        try:
+            org_id, body = await loader()
+            entry = self.put(code, org_id, body)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita "exception was never retrieved" quando ninguém estava esperando
+            future.exception()
+            raise
+        finally:
+            del self._loading[code]
+
+    def invalidate_org(self, org_id: int) -> None:
+        """Remove as entradas de uma organização (lojas, setores ou código mudaram)."""
+        for code in [code for code, entry in self._entries.items() if entry.org_id == org_id]:
+            del self._entries[code]
+
+    def invalidate_code(self, code: str) -> None:
+        """Remove um código específico (ex: código novo que estava no cache negativo)."""
+        self._entries.pop(code, None)
+
+    def snapshot(self) -> dict:
+        """Estado atual para métricas."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+        }
+
+
+public_org_cache = PublicOrgCache(
+    ttl=settings.PUBLIC_ORG_CACHE_TTL,
+    negative_ttl=settings.PUBLIC_ORG_NEGATIVE_CACHE_TTL,
+    max_entries=settings.PUBLIC_ORG_CACHE_MAX_ENTRIES,
+)
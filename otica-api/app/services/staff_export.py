@@ -0,0 +1,93 @@
+"""Exportação de Staff em streaming (CSV/NDJSON) com cursor do lado do servidor."""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import Select, select
+from app.core.database import AsyncSessionLocal
+from app.models.staff_model import StaffMember
+
+
+# Mesmos campos de StaffResponse
+EXPORT_COLUMNS = [
+    StaffMember.id,
+    StaffMember.organization_id,
+    StaffMember.full_name,
+    StaffMember.email,
+    StaffMember.role,
+    StaffMember.store_id,
+    StaffMember.department_id,
+    StaffMember.is_active,
+    StaffMember.clerk_id,
+    StaffMember.avatar_url,
+    StaffMember.created_at,
+    StaffMember.updated_at,
+]
+EXPORT_FIELDNAMES = [column.key for column in EXPORT_COLUMNS]
+
+# Linhas buscadas por ida ao cursor
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def build_export_query() -> Select:
+    """SELECT apenas com as colunas exportadas (sem hidratar entidades ORM)."""
+    return select(*EXPORT_COLUMNS).order_by(StaffMember.id)
+
+
+def _to_plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, include_header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(EXPORT_FIELDNAMES)
+    for row in rows:
+        writer.writerow(["" if value is None else _to_plain(value) for value in row])
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(
+            {name: _to_plain(value) for name, value in zip(EXPORT_FIELDNAMES, row)},
+            ensure_ascii=False,
+        ) + "\n"
+        for row in rows
+    )
+
+
+async def stream_staff_export(query: Select, file_format: str) -> AsyncIterator[bytes]:
+    """
+    Gera o arquivo de exportação em blocos de EXPORT_BATCH_SIZE linhas.
+
+    Usa uma sessão própria (a de get_db pode ser fechada antes do fim do
+    streaming) e AsyncSession.stream, que mantém um cursor no servidor:
+    a memória fica constante, independente do tamanho da organização.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        if file_format == "csv":
+            yield _encode_csv([], include_header=True).encode("utf-8")
+
+        async for rows in result.partitions():
+            if file_format == "csv":
+                chunk = _encode_csv(rows, include_header=False)
+            else:
+                chunk = _encode_ndjson(rows)
+            yield chunk.encode("utf-8")
@@ -0,0 +1,251 @@
+"""Importação em massa de Staff (CSV/NDJSON) via COPY do asyncpg."""
+import codecs
+import csv
+import json
+from typing import AsyncIterator
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.staff_schema import StaffCreate, StaffImportResult, StaffImportRowResult
+
+
+STAGING_TABLE = "staff_import_staging"
+STAGING_COLUMNS = [
+    "row_number",
+    "full_name",
+    "email",
+    "role",
+    "store_id",
+    "department_id",
+    "is_active",
+]
+
+# Tabela temporária por transação: some no commit/rollback
+CREATE_STAGING_SQL = f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        row_number integer PRIMARY KEY,
+        full_name text NOT NULL,
+        email text NOT NULL,
+        role text NOT NULL,
+        store_id integer,
+        department_id integer,
+        is_active boolean NOT NULL,
+        error text
+    ) ON COMMIT DROP
+"""
+
+VALIDATE_STORE_SQL = f"""
+    UPDATE {STAGING_TABLE} s SET error = 'Loja não encontrada'
+    WHERE s.store_id IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM stores st
+          JOIN organizations o ON o.id = st.organization_id
+          WHERE st.id = s.store_id AND o.clerk_org_id = $1
+      )
+"""
+
+VALIDATE_DEPARTMENT_SQL = f"""
+    UPDATE {STAGING_TABLE} s SET error = 'Setor não encontrado'
+    WHERE s.error IS NULL
+      AND s.department_id IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM departments d
+          JOIN organizations o ON o.id = d.organization_id
+          WHERE d.id = s.department_id AND o.clerk_org_id = $1
+      )
+"""
+
+MARK_FILE_DUPLICATES_SQL = f"""
+    UPDATE {STAGING_TABLE} s SET error = 'Email duplicado no arquivo'
+    FROM (
+        SELECT row_number,
+               row_number() OVER (PARTITION BY email ORDER BY row_number) AS occurrence
+        FROM {STAGING_TABLE}
+        WHERE error IS NULL
+    ) d
+    WHERE s.row_number = d.row_number AND d.occurrence > 1
+"""
+
+# ON CONFLICT usa o index único idx_staff_org_email (organization_id, email)
+MERGE_SQL = f"""
+    INSERT INTO staff_members (
+        organization_id, full_name, email, role, store_id, department_id, is_active
+    )
+    SELECT $1, s.full_name, s.email, s.role::staffrole, s.store_id, s.department_id, s.is_active
+    FROM {STAGING_TABLE} s
+    WHERE s.error IS NULL
+    ORDER BY s.row_number
+    ON CONFLICT (organization_id, email) DO NOTHING
+    RETURNING id, email
+"""
+
+SELECT_ROWS_SQL = f"""
+    SELECT row_number, email, error FROM {STAGING_TABLE} ORDER BY row_number
+"""
+
+
+class StaffImportError(ValueError):
+    """Arquivo de importação inválido (cabeçalho, formato ou limite de linhas)."""
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Converte um stream de bytes em linhas de texto, sem carregar tudo em memória."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+
+def _parse_csv_line(line: str) -> list[str]:
+    return next(csv.reader([line]))
+
+
+async def _iter_raw_rows(chunks: AsyncIterator[bytes], file_format: str) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Gera (número da linha, dados brutos) para cada registro do arquivo.
+
+    CSV: a primeira linha é o cabeçalho (full_name, email, role, store_id,
+    department_id, is_active). Campos com quebra de linha não são suportados.
+    NDJSON: um objeto JSON por linha.
+    """
+    header = None
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+
+        if file_format == "csv" and header is None:
+            header = [column.strip() for column in _parse_csv_line(line)]
+            missing = {"full_name", "email", "role"} - set(header)
+            if missing:
+                raise StaffImportError(f"Colunas obrigatórias ausentes: {', '.join(sorted(missing))}")
+            continue
+
+        row_number += 1
+        if file_format == "csv":
+            values = _parse_csv_line(line)
+            # Campos vazios ficam de fora para valerem os defaults do schema
+            yield row_number, {
+                column: value.strip()
+                for column, value in zip(header, values)
+                if value.strip()
+            }
+        else:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                data = None
+            yield row_number, data if isinstance(data, dict) else None
+
+
+def _to_record(row_number: int, staff: StaffCreate) -> tuple:
+    return (
+        row_number,
+        staff.full_name,
+        staff.email,
+        staff.role.value,
+        staff.store_id,
+        staff.department_id,
+        staff.is_active,
+    )
+
+
+async def _iter_records(
+    chunks: AsyncIterator[bytes],
+    file_format: str,
+    invalid_rows: list[StaffImportRowResult],
+    max_rows: int,
+) -> AsyncIterator[tuple]:
+    """Valida cada linha com StaffCreate e gera os records para o COPY."""
+    async for row_number, data in _iter_raw_rows(chunks, file_format):
+        if row_number > max_rows:
+            raise StaffImportError(f"Arquivo excede o limite de {max_rows} linhas")
+
+        if data is None:
+            invalid_rows.append(StaffImportRowResult(
+                row=row_number, email=None, status="error", error="JSON inválido"
+            ))
+            continue
+
+        try:
+            staff = StaffCreate.model_validate(data)
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"]) or "linha"
+            invalid_rows.append(StaffImportRowResult(
+                row=row_number,
+                email=data.get("email") if isinstance(data.get("email"), str) else None,
+                status="error",
+                error=f"{field}: {error['msg']}",
+            ))
+            continue
+
+        yield _to_record(row_number, staff)
+
+
+async def import_staff(
+    db: AsyncSession,
+    organization_id: str,
+    chunks: AsyncIterator[bytes],
+    file_format: str,
+    max_rows: int,
+) -> StaffImportResult:
+    """
+    Importa staff em massa para a organização.
+
+    1. Valida as linhas em streaming e envia via COPY para uma tabela temporária
+    2. Marca lojas/setores inválidos e emails repetidos no próprio arquivo
+    3. Insere tudo em um único INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    4. Monta o relatório por linha
+
+    Não faz commit: o chamador decide (commit ou rollback).
+    """
+    invalid_rows: list[StaffImportRowResult] = []
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    conn = raw_connection.driver_connection
+
+    await conn.execute(CREATE_STAGING_SQL)
+    await conn.copy_records_to_table(
+        STAGING_TABLE,
+        records=_iter_records(chunks, file_format, invalid_rows, max_rows),
+        columns=STAGING_COLUMNS,
+    )
+
+    await conn.execute(VALIDATE_STORE_SQL, organization_id)
+    await conn.execute(VALIDATE_DEPARTMENT_SQL, organization_id)
+    await conn.execute(MARK_FILE_DUPLICATES_SQL)
+
+    inserted = {record["email"]: record["id"] for record in await conn.fetch(MERGE_SQL, organization_id)}
+
+    rows = list(invalid_rows)
+    for record in await conn.fetch(SELECT_ROWS_SQL):
+        if record["error"]:
+            rows.append(StaffImportRowResult(
+                row=record["row_number"], email=record["email"], status="error", error=record["error"]
+            ))
+        elif record["email"] in inserted:
+            rows.append(StaffImportRowResult(
+                row=record["row_number"], email=record["email"], status="created",
+                staff_id=inserted[record["email"]],
+            ))
+        else:
+            rows.append(StaffImportRowResult(
+                row=record["row_number"], email=record["email"], status="skipped",
+                error="Email já cadastrado nesta organização",
+            ))
+    rows.sort(key=lambda row: row.row)
+
+    return StaffImportResult(
+        total=len(rows),
+        created=sum(1 for row in rows if row.status == "created"),
+        skipped=sum(1 for row in rows if row.status == "skipped"),
+        errors=sum(1 for row in rows if row.status == "error"),
+        rows=rows,
+    )
@@ -0,0 +1,112 @@
+"""
+Benchmark: serialização de 10k StaffResponse pelo FastAPI.
+
+Compara, com a app FastAPI real em memória (ASGI, sem rede):
+- antes:          JSONResponse padrão + response_model
+- default:        FastJSONResponse (default_response_class da app)
+- model_response: validação única + dump_json (app/core/responses.py)
+
+Resultado de referência (10k itens, melhor de 5):
+    FastAPI 0.122:  antes 102 ms | default 66 ms | model_response 44 ms
+    FastAPI 0.143:  antes  85 ms | default 49 ms | model_response 31 ms
+
+Uso:
+    python scripts/benchmark_json_encoding.py
+    python scripts/benchmark_json_encoding.py --items 10000 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+import time
+from datetime import datetime, timezone
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fastapi
+import httpx
+from typing import List
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.core.responses import FastJSONResponse, model_response
+from app.models.staff_model import StaffRole
+from app.schemas.staff_schema import StaffResponse
+
+
+ROLES = list(StaffRole)
+
+
+def build_items(count: int) -> list[StaffResponse]:
+    """Gera `count` StaffResponse já validados (como sairiam do endpoint)."""
+    now = datetime.now(timezone.utc)
+    return [
+        StaffResponse(
+            id=i,
+            organization_id="org_benchmark",
+            full_name=f"Pessoa Benchmark {i}",
+            email=f"bench{i}@example.com",
+            role=ROLES[i % len(ROLES)],
+            store_id=i % 10 or None,
+            department_id=i % 7 or None,
+            is_active=True,
+            clerk_id=f"user_{i:08d}",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(items: list[StaffResponse]) -> FastAPI:
+    """Uma rota por variante, todas com o mesmo response_model."""
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/antes", response_model=List[StaffResponse], response_class=JSONResponse)
+    async def antes():
+        return items
+
+    @app.get("/default", response_model=List[StaffResponse])
+    async def default():
+        return items
+
+    @app.get("/model_response", response_model=List[StaffResponse])
+    async def fast():
+        return model_response(List[StaffResponse], items)
+
+    return app
+
+
+async def main(count: int, runs: int) -> None:
+    items = build_items(count)
+    app = build_app(items)
+    transport = httpx.ASGITransport(app=app)
+
+    print(f"📊 FastAPI {fastapi.__version__}: {count} StaffResponse, melhor de {runs} execuções\n")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        reference = None
+        for name in ("antes", "default", "model_response"):
+            best = float("inf")
+            for _ in range(runs):
+                start = time.perf_counter()
+                response = await client.get(f"/{name}")
+                best = min(best, time.perf_counter() - start)
+            response.raise_for_status()
+
+            data = json.loads(response.content)
+            if reference is None:
+                reference = data
+            same = "ok" if data == reference else "DIFERENTE"
+            print(
+                f"{name:<15} {best * 1000:>8.1f} ms  {count / best:>10,.0f} itens/s  "
+                f"resposta {len(response.content) / 1024:.0f} KiB  conteúdo {same}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.runs))
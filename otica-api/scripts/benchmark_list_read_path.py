@@ -0,0 +1,144 @@
+"""
+Benchmark: listagem de staff via ORM + response_model vs caminho Core (fast_read).
+
+Cria uma organização temporária com N membros, mede linhas/s e pico de
+memória (tracemalloc) dos dois caminhos e remove os dados no final.
+
+Uso:
+    python scripts/benchmark_list_read_path.py
+    python scripts/benchmark_list_read_path.py --rows 50000 --runs 3
+    python scripts/benchmark_list_read_path.py --database-url sqlite+aiosqlite://
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+import time
+import tracemalloc
+import uuid
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import List
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert, null, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.core.database import Base
+from app.core.fast_read import fetch_json_response, schema_columns
+from app.models import StaffMember, StaffRole
+from app.schemas.staff_schema import StaffResponse, StaffWithDetails
+
+
+STAFF_LIST_COLUMNS = schema_columns(StaffMember, StaffResponse)
+ROLES = list(StaffRole)
+
+
+async def seed(session: AsyncSession, org_id: str, rows: int) -> None:
+    """Insere `rows` membros na organização de benchmark."""
+    batch_size = 5000
+    for start in range(0, rows, batch_size):
+        await session.execute(
+            insert(StaffMember),
+            [
+                {
+                    "organization_id": org_id,
+                    "full_name": f"Pessoa Benchmark {i}",
+                    "email": f"bench{i}@example.com",
+                    "role": ROLES[i % len(ROLES)],
+                    "is_active": True,
+                }
+                for i in range(start, min(start + batch_size, rows))
+            ],
+        )
+    await session.commit()
+
+
+async def orm_path(session: AsyncSession, org_id: str) -> bytes:
+    """Caminho anterior: entidades ORM + validação/serialização do response_model."""
+    result = await session.execute(
+        select(StaffMember).where(StaffMember.organization_id == org_id)
+    )
+    staff_members = result.scalars().all()
+    adapter = TypeAdapter(List[StaffWithDetails])
+    validated = adapter.validate_python(staff_members, from_attributes=True)
+    # Mesma serialização do JSONResponse do Starlette
+    body = json.dumps(
+        adapter.dump_python(validated, mode="json"),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    session.expunge_all()
+    return body
+
+
+async def core_path(session: AsyncSession, org_id: str) -> bytes:
+    """Caminho novo: colunas Core serializadas direto em bytes."""
+    query = select(
+        *STAFF_LIST_COLUMNS,
+        null().label("store_name"),
+        null().label("department_name"),
+    ).where(StaffMember.organization_id == org_id)
+    response = await fetch_json_response(session, query)
+    return response.body
+
+
+async def measure(name: str, fn, session_factory, org_id: str, rows: int, runs: int) -> None:
+    """Imprime o melhor tempo de `runs` execuções e o pico de memória de uma execução extra."""
+    best = float("inf")
+    for _ in range(runs):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            body = await fn(session, org_id)
+            best = min(best, time.perf_counter() - start)
+
+    # tracemalloc deixa a execução bem mais lenta: mede memória à parte
+    async with session_factory() as session:
+        tracemalloc.start()
+        await fn(session, org_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(
+        f"{name:<6} {best * 1000:>9.1f} ms  {rows / best:>12,.0f} linhas/s  "
+        f"pico {peak / 1024 / 1024:>7.1f} MiB  resposta {len(body) / 1024 / 1024:.1f} MiB"
+    )
+
+
+async def main(database_url: str | None, rows: int, runs: int) -> None:
+    if database_url:
+        engine = create_async_engine(database_url)
+    else:
+        from app.core.database import engine
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    org_id = f"bench_org_{uuid.uuid4().hex[:8]}"
+
+    if database_url and database_url.startswith("sqlite"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    print(f"📊 Populando {rows} membros em {org_id}...")
+    async with session_factory() as session:
+        await seed(session, org_id, rows)
+
+    try:
+        print()
+        await measure("orm", orm_path, session_factory, org_id, rows, runs)
+        await measure("core", core_path, session_factory, org_id, rows, runs)
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(StaffMember).where(StaffMember.organization_id == org_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Padrão: DATABASE_URL do .env")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.rows, args.runs))
@@ -0,0 +1,51 @@
+"""Script para criar indexes novos em tabelas que já existem."""
+import asyncio
+import sys
+import os
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine, Base
+from app import models  # Importa para registrar todos os models
+
+
+def _create_missing_indexes(sync_conn) -> list[str]:
+    """Cria os indexes declarados nos models que ainda não existem no banco."""
+    created = []
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+            created.append(f"{table.name}.{index.name}")
+    return created
+
+
+async def create_indexes():
+    """
+    Sincroniza os indexes dos models com o banco.
+    
+    O create_all (scripts/create_tables.py) só cria indexes junto com tabelas
+    novas; este script cobre indexes adicionados depois em tabelas existentes.
+    """
+    print("🔌 Conectando ao banco de dados...")
+    
+    try:
+        async with engine.begin() as conn:
+            indexes = await conn.run_sync(_create_missing_indexes)
+        
+        print("✅ Indexes verificados/criados:")
+        for name in indexes:
+            print(f"   - {name}")
+    
+    except Exception as e:
+        print(f"❌ Erro ao criar indexes: {str(e)}")
+        raise
+    finally:
+        try:
+            await engine.dispose()
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    asyncio.run(create_indexes())
@@ -0,0 +1,353 @@
+"""
+Servidor fake do Clerk para testes de carga e integração offline.
+
+Serve JWKS, usuários, convites e memberships em memória, com latência e
+injeção de erros configuráveis, e emite tokens RS256 com org_id / o.id
+assinados pela mesma chave do JWKS.
+
+Uso:
+    # 1. Sobe o fake (porta 8900)
+    python scripts/fake_clerk.py serve --port 8900 --latency-ms 80 --error-rate 0.02
+
+    # 2. Aponta a API para ele (.env)
+    CLERK_ISSUER=http://localhost:8900
+    CLERK_API_URL=http://localhost:8900/v1
+    CLERK_SECRET_KEY=sk_test_fake
+
+    # 3. Gera um token (o usuário é criado no fake com esse email)
+    curl -X POST localhost:8900/_fake/tokens \\
+         -H "Content-Type: application/json" \\
+         -d '{"email": "admin@otica.com", "org_id": "org_fake"}'
+
+    # Ou offline, só para benchmarks de verify_token (mesma chave do servidor)
+    python scripts/fake_clerk.py token --user-id user_1 --org-id org_fake
+
+    # Ajusta latência/erros em tempo de execução
+    curl -X PUT localhost:8900/_fake/config -H "Content-Type: application/json" \\
+         -d '{"latency_ms": 300, "error_rate": 0.5, "error_status": 503}'
+"""
+import argparse
+import asyncio
+import base64
+import os
+import random
+import sys
+import time
+import uuid
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typing import Optional
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from jose import jwt
+from pydantic import BaseModel
+
+
+DEFAULT_KEY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fake_clerk_key.pem")
+KEY_ID = "fake-clerk-key-1"
+
+
+# ============================================
+# CHAVE E TOKENS
+# ============================================
+
+def load_or_create_key(path: str = DEFAULT_KEY_PATH) -> rsa.RSAPrivateKey:
+    """Carrega a chave RSA do fake (cria na primeira execução)."""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return serialization.load_pem_private_key(f.read(), password=None)
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with open(path, "wb") as f:
+        f.write(key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ))
+    return key
+
+
+def _b64url_uint(value: int) -> str:
+    data = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def build_jwks(key: rsa.RSAPrivateKey) -> dict:
+    """JWKS público no mesmo formato do Clerk."""
+    numbers = key.public_key().public_numbers()
+    return {
+        "keys": [{
+            "kty": "RSA",
+            "use": "sig",
+            "alg": "RS256",
+            "kid": KEY_ID,
+            "n": _b64url_uint(numbers.n),
+            "e": _b64url_uint(numbers.e),
+        }]
+    }
+
+
+def mint_token(
+    key: rsa.RSAPrivateKey,
+    issuer: str,
+    user_id: str,
+    org_id: Optional[str],
+    ttl: int = 3600,
+    org_claim: str = "org_id",
+) -> str:
+    """
+    Emite um token RS256 como os de sessão do Clerk.
+
+    org_claim="org_id" usa o claim direto; org_claim="o" usa o objeto
+    {"o": {"id": ...}} dos tokens mais novos do Clerk.
+    """
+    now = int(time.time())
+    claims = {
+        "iss": issuer,
+        "sub": user_id,
+        "iat": now,
+        "nbf": now - 5,
+        "exp": now + ttl,
+        "sid": f"sess_{uuid.uuid4().hex[:24]}",
+    }
+    if org_id:
+        if org_claim == "o":
+            claims["o"] = {"id": org_id, "rol": "admin"}
+        else:
+            claims["org_id"] = org_id
+
+    pem = key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": KEY_ID})
+
+
+# ============================================
+# SERVIDOR
+# ============================================
+
+class FakeConfig(BaseModel):
+    """Comportamento do fake (alterável via PUT /_fake/config)."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: Optional[int] = None  # Enviado junto com respostas 429
+
+
+class TokenRequest(BaseModel):
+    email: str
+    org_id: Optional[str] = None
+    user_id: Optional[str] = None
+    ttl: int = 3600
+    org_claim: str = "org_id"
+
+
+def create_app(issuer: str, config: FakeConfig, key_path: str = DEFAULT_KEY_PATH) -> FastAPI:
+    """Cria a aplicação ASGI do fake."""
+    app = FastAPI(title="Fake Clerk", docs_url="/_fake/docs", redoc_url=None)
+    key = load_or_create_key(key_path)
+    jwks = build_jwks(key)
+
+    state = {
+        "config": config,
+        "users": {},          # user_id -> user
+        "invitations": {},    # invitation_id -> invitation
+        "memberships": {},    # (org_id, user_id) -> membership
+        "requests": 0,
+    }
+
+    def make_user(email: str, user_id: Optional[str] = None, first_name: str = "", last_name: str = "") -> dict:
+        user_id = user_id or f"user_{uuid.uuid4().hex[:24]}"
+        email_id = f"idn_{uuid.uuid4().hex[:24]}"
+        user = {
+            "id": user_id,
+            "object": "user",
+            "first_name": first_name,
+            "last_name": last_name,
+            "primary_email_address_id": email_id,
+            "email_addresses": [{"id": email_id, "email_address": email}],
+            "created_at": int(time.time() * 1000),
+        }
+        state["users"][user_id] = user
+        return user
+
+    def find_user_by_email(email: str) -> Optional[dict]:
+        for user in state["users"].values():
+            if any(e["email_address"] == email for e in user["email_addresses"]):
+                return user
+        return None
+
+    @app.middleware("http")
+    async def inject_latency_and_errors(request: Request, call_next):
+        if request.url.path.startswith("/_fake"):
+            return await call_next(request)
+
+        state["requests"] += 1
+        cfg: FakeConfig = state["config"]
+        delay = cfg.latency_ms + random.uniform(0, cfg.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            headers = {}
+            if cfg.error_status == 429 and cfg.retry_after is not None:
+                headers["Retry-After"] = str(cfg.retry_after)
+            return JSONResponse(
+                {"errors": [{"code": "fake_injected_error", "message": "Erro injetado pelo fake"}]},
+                status_code=cfg.error_status,
+                headers=headers,
+            )
+
+        return await call_next(request)
+
+    # --- JWKS -------------------------------------------------------------
+
+    @app.get("/.well-known/jwks.json")
+    async def get_jwks():
+        return jwks
+
+    # --- Users ------------------------------------------------------------
+
+    @app.get("/v1/users")
+    async def list_users(email_address: Optional[str] = None):
+        if email_address:
+            user = find_user_by_email(email_address)
+            return [user] if user else []
+        return list(state["users"].values())
+
+    @app.get("/v1/users/{user_id}")
+    async def get_user(user_id: str):
+        user = state["users"].get(user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail={"errors": [{"code": "resource_not_found"}]})
+        return user
+
+    @app.post("/v1/users")
+    async def create_user(payload: dict):
+        email = (payload.get("email_address") or [None])[0]
+        if not email:
+            raise HTTPException(status_code=422, detail={"errors": [{"code": "form_param_missing"}]})
+        if find_user_by_email(email):
+            raise HTTPException(status_code=422, detail={"errors": [{"code": "form_identifier_exists"}]})
+        return make_user(email, first_name=payload.get("first_name", ""), last_name=payload.get("last_name", ""))
+
+    @app.delete("/v1/users/{user_id}")
+    async def delete_user(user_id: str):
+        if state["users"].pop(user_id, None) is None:
+            raise HTTPException(status_code=404, detail={"errors": [{"code": "resource_not_found"}]})
+        return {"id": user_id, "object": "user", "deleted": True}
+
+    # --- Organizations ----------------------------------------------------
+
+    @app.post("/v1/organizations/{org_id}/invitations")
+    async def create_invitation(org_id: str, payload: dict):
+        invitation_id = f"orginv_{uuid.uuid4().hex[:24]}"
+        invitation = {
+            "id": invitation_id,
+            "object": "organization_invitation",
+            "email_address": payload.get("email_address"),
+            "organization_id": org_id,
+            "role": payload.get("role", "org:member"),
+            "status": "pending",
+            "created_at": int(time.time() * 1000),
+        }
+        state["invitations"][invitation_id] = invitation
+        return invitation
+
+    @app.post("/v1/organizations/{org_id}/memberships")
+    async def create_membership(org_id: str, payload: dict):
+        user_id = payload.get("user_id")
+        if user_id not in state["users"]:
+            raise HTTPException(status_code=404, detail={"errors": [{"code": "resource_not_found"}]})
+        membership = {
+            "id": f"orgmem_{uuid.uuid4().hex[:24]}",
+            "object": "organization_membership",
+            "organization": {"id": org_id},
+            "public_user_data": {"user_id": user_id},
+            "role": payload.get("role", "org:member"),
+        }
+        state["memberships"][(org_id, user_id)] = membership
+        return membership
+
+    # --- Controle do fake -------------------------------------------------
+
+    @app.get("/_fake/config")
+    async def get_config():
+        return state["config"]
+
+    @app.put("/_fake/config")
+    async def update_config(new_config: FakeConfig):
+        state["config"] = new_config
+        return new_config
+
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return {
+            "requests": state["requests"],
+            "users": len(state["users"]),
+            "invitations": len(state["invitations"]),
+            "memberships": len(state["memberships"]),
+        }
+
+    @app.post("/_fake/tokens")
+    async def create_token(data: TokenRequest):
+        """Cria (ou reutiliza) o usuário pelo email e devolve um token para ele."""
+        user = find_user_by_email(data.email) or make_user(data.email, user_id=data.user_id)
+        token = mint_token(key, issuer, user["id"], data.org_id, ttl=data.ttl, org_claim=data.org_claim)
+        return {"user_id": user["id"], "token": token}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--key-path", default=DEFAULT_KEY_PATH)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    serve = subcommands.add_parser("serve", help="Sobe o servidor fake")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8900)
+    serve.add_argument("--issuer", default=None, help="Padrão: http://HOST:PORT")
+    serve.add_argument("--latency-ms", type=float, default=0.0)
+    serve.add_argument("--jitter-ms", type=float, default=0.0)
+    serve.add_argument("--error-rate", type=float, default=0.0)
+    serve.add_argument("--error-status", type=int, default=503)
+    serve.add_argument("--retry-after", type=int, default=None)
+
+    token = subcommands.add_parser("token", help="Emite um token offline")
+    token.add_argument("--issuer", default="http://127.0.0.1:8900")
+    token.add_argument("--user-id", required=True)
+    token.add_argument("--org-id", default=None)
+    token.add_argument("--ttl", type=int, default=3600)
+    token.add_argument("--org-claim", choices=["org_id", "o"], default="org_id")
+
+    args = parser.parse_args()
+
+    if args.command == "token":
+        key = load_or_create_key(args.key_path)
+        print(mint_token(key, args.issuer, args.user_id, args.org_id, ttl=args.ttl, org_claim=args.org_claim))
+        return
+
+    import uvicorn
+
+    issuer = args.issuer or f"http://{args.host}:{args.port}"
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+    )
+    print(f"🧪 Fake Clerk em {issuer} (CLERK_ISSUER={issuer}, CLERK_API_URL={issuer}/v1)")
+    uvicorn.run(create_app(issuer, config, args.key_path), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()